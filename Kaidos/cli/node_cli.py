@@ -1,24 +1,87 @@
 import argparse
+import atexit
+import os
 import sys
-import json
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional
 
-from Kaidos.network.node import Node
-from Kaidos.core.blockchain import Blockchain
-from Kaidos.core.transaction_manager import TransactionManager
-from Kaidos.core.exceptions import InvalidBlockError, InvalidTransactionError
+from Kaidos.core.serialization import json_dumps, json_loads, JSONDecodeError
+
+
+# Shared HTTP session so consecutive requests to a node reuse keep-alive connections
+_SESSION = requests.Session()
+_POOL_HOSTS = 4
+_POOL_CONNECTIONS = 16
+_SESSION.mount("http://", HTTPAdapter(pool_connections=_POOL_HOSTS, pool_maxsize=_POOL_CONNECTIONS))
+atexit.register(_SESSION.close)
+
+# Ask for compressed responses; urllib3 can only decode brotli when it is installed
+try:
+    import brotli
+    _SESSION.headers["Accept-Encoding"] = "gzip, deflate, br"
+except ImportError:
+    _SESSION.headers["Accept-Encoding"] = "gzip, deflate"
+
+# (connect, read) timeouts in seconds
+_FAST_TIMEOUT = (2.0, 5.0)
+_SYNC_TIMEOUT = (2.0, 60.0)
+_MINE_TIMEOUT = (2.0, 120.0)
+
+# Delays between polls of a background mining job; later polls wait 2 seconds
+_POLL_DELAYS = (0.2, 0.2, 0.5, 0.5, 1.0)
+
+# Longest time in seconds to wait for a background mining job
+_MINE_MAX_WAIT = 600.0
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _size_pool(hosts: int, connections: int) -> None:
+    # Grow the pool before a fan-out so concurrent requests keep their connections
+    # instead of opening throwaway ones once the pool is full
+    global _POOL_HOSTS, _POOL_CONNECTIONS
+    
+    if hosts <= _POOL_HOSTS and connections <= _POOL_CONNECTIONS:
+        return
+        
+    _POOL_HOSTS = max(hosts, _POOL_HOSTS)
+    _POOL_CONNECTIONS = max(connections, _POOL_CONNECTIONS)
+    _SESSION.mount("http://", HTTPAdapter(pool_connections=_POOL_HOSTS, pool_maxsize=_POOL_CONNECTIONS))
+
+
+def _post_json(url: str, payload: Any, **kwargs) -> requests.Response:
+    # Serialize the body here so requests doesn't run it through json.dumps
+    return _SESSION.post(url, data=json_dumps(payload), headers=_JSON_HEADERS, **kwargs)
+
+
+def _parse(response: requests.Response) -> Any:
+    # Decode a response body once; non-JSON bodies (e.g. a proxy's 502 page) become {}
+    try:
+        return json_loads(response.content)
+    except ValueError:
+        return {}
+
+# Last UTXO response per node and address, revalidated with If-None-Match
+_UTXO_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".kaidos", "utxo_cache.json")
 
 
 def init_node(args: argparse.Namespace) -> None:
+    # Imported here so remote commands don't pay for loading the database layer
+    from Kaidos.core.blockchain import Blockchain
+    
+    blockchain = None
     try:
         # Initialize blockchain
         blockchain = Blockchain()
+        valid, genesis_hash = blockchain.initialize()
         
         # Check if blockchain is valid
-        if blockchain.is_chain_valid():
+        if valid:
             print("Blockchain initialized successfully")
-            print(f"Genesis block created with hash: {blockchain.get_block_by_index(0)['hash']}")
+            print(f"Genesis block created with hash: {genesis_hash}")
         else:
             print("Error: Blockchain validation failed")
             sys.exit(1)
@@ -27,16 +90,19 @@ def init_node(args: argparse.Namespace) -> None:
         print(f"Error initializing node: {str(e)}")
         sys.exit(1)
     finally:
-        blockchain.close()
+        if blockchain is not None:
+            blockchain.close()
 
 
 def start_node(args: argparse.Namespace) -> None:
+    from Kaidos.network.node import Node
+    
     try:
         host = args.host
         port = args.port
         
         print(f"Starting Kaidos node on {host}:{port}...")
-        node = Node(host=host, port=port)
+        node = Node(host=host, port=port, mining_processes=args.mining_processes)
         node.start()
         
     except Exception as e:
@@ -44,44 +110,68 @@ def start_node(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
-def add_peer(args: argparse.Namespace) -> None:
+def _add_peer_to_node(node: str, peer: str) -> Optional[str]:
+    # Returns None on success, otherwise an error message
     try:
-        # Connect to local node
-        response = requests.post(
-            f"http://{args.node}/peers",
-            json={"address": args.peer}
+        response = _post_json(
+            f"http://{node}/peers",
+            {"address": peer},
+            timeout=_SYNC_TIMEOUT
         )
         
         if response.status_code == 200:
-            print(f"Peer {args.peer} added successfully")
-        else:
-            print(f"Error adding peer: {response.json().get('error', 'Unknown error')}")
-            sys.exit(1)
-            
+            return None
+        return f"Error adding peer: {_parse(response).get('error', 'Unknown error')}"
+        
     except requests.RequestException as e:
-        print(f"Error connecting to node: {str(e)}")
+        return f"Error connecting to node: {str(e)}"
+
+
+def add_peer(args: argparse.Namespace) -> None:
+    nodes = args.node or ["localhost:5000"]
+    failed = False
+    
+    # Register the peer with every node at once
+    _size_pool(len(nodes), 1)
+    with ThreadPoolExecutor(max_workers=len(nodes)) as pool:
+        futures = {pool.submit(_add_peer_to_node, node, args.peer): node for node in nodes}
+        
+        for future in as_completed(futures):
+            error = future.result()
+            prefix = f"[{futures[future]}] " if len(nodes) > 1 else ""
+            
+            if error is None:
+                print(f"{prefix}Peer {args.peer} added successfully")
+            else:
+                print(f"{prefix}{error}")
+                failed = True
+    
+    if failed:
         sys.exit(1)
 
 
 def list_peers(args: argparse.Namespace) -> None:
     try:
         # Connect to local node
-        response = requests.get(f"http://{args.node}/peers")
+        response = _SESSION.get(f"{args.base_url}/peers", timeout=_FAST_TIMEOUT)
+        body = _parse(response)
         
         if response.status_code == 200:
-            peers = response.json()["peers"]
+            peers = body["peers"]
             
             if not peers:
                 print("No peers found")
                 return
                 
-            print(f"Found {len(peers)} peers:")
+            # Build the listing in memory and write it out once
+            parts = [f"Found {len(peers)} peers:\n"]
             for peer in peers:
-                print(f"  Address: {peer['address']}")
-                print(f"  Last seen: {peer.get('last_seen', 'Never')}")
-                print()
+                parts.append(f"  Address: {peer['address']}\n")
+                parts.append(f"  Last seen: {peer.get('last_seen', 'Never')}\n")
+                parts.append("\n")
+            sys.stdout.write("".join(parts))
         else:
-            print(f"Error listing peers: {response.json().get('error', 'Unknown error')}")
+            print(f"Error listing peers: {body.get('error', 'Unknown error')}")
             sys.exit(1)
             
     except requests.RequestException as e:
@@ -89,68 +179,177 @@ def list_peers(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
+def _print_mined_block(result: Dict[str, Any]) -> None:
+    block = result["block"]
+    reward = result["reward"]
+    
+    print(f"Block mined successfully:")
+    print(f"  Index: {block['index']}")
+    print(f"  Hash: {block['hash']}")
+    print(f"  Transactions: {len(block['transactions'])}")
+    print(f"  Miner: {block['miner_address']}")
+    print(f"  Reward: {reward}")
+    print(f"  Nonce: {block['nonce']}")
+
+
+def _poll_delay(attempt: int) -> float:
+    return _POLL_DELAYS[attempt] if attempt < len(_POLL_DELAYS) else 2.0
+
+
+def _mine_one(url: str, address: str) -> Dict[str, Any]:
+    # Start a background mining job; the node answers right away with its id, but
+    # a node without background mining only answers once the block is mined
+    response = _post_json(
+        url,
+        {"miner_address": address, "async": True},
+        timeout=_MINE_TIMEOUT
+    )
+    body = _parse(response)
+    
+    # Nodes without background mining reply with the mined block directly
+    if response.status_code == 200:
+        return {"status": "done", "result": body}
+    if response.status_code != 202:
+        return {"status": "error", "error": body.get('error', 'Unknown error')}
+        
+    job_url = f"{url}/{body['mine_id']}"
+    attempt = 0
+    deadline = time.monotonic() + _MINE_MAX_WAIT
+    
+    # Poll with short delays first, backing off while proof-of-work runs
+    while time.monotonic() < deadline:
+        time.sleep(_poll_delay(attempt))
+        attempt += 1
+        
+        response = _SESSION.get(job_url, timeout=_FAST_TIMEOUT)
+        job = _parse(response)
+        
+        if response.status_code != 200:
+            return {"status": "error", "error": job.get('error', 'Unknown error')}
+        if job["status"] != "pending":
+            return job
+            
+    return {"status": "error", "error": f"Timed out after {_MINE_MAX_WAIT:.0f}s waiting for mining job {body['mine_id']}"}
+
+
 def mine_block(args: argparse.Namespace) -> None:
-    try:
-        # Connect to local node
-        response = requests.post(
-            f"http://{args.node}/blocks/mine",
-            json={"miner_address": args.address}
-        )
+    url = f"{args.base_url}/blocks/mine"
+    failures = 0
+    
+    # Jobs share the keep-alive session; results are printed as they complete
+    _size_pool(1, max(1, args.concurrency))
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        futures = [
+            pool.submit(_mine_one, url, args.address)
+            for _ in range(max(1, args.count))
+        ]
         
-        if response.status_code == 200:
-            result = response.json()
-            block = result["block"]
-            reward = result["reward"]
-            
-            print(f"Block mined successfully:")
-            print(f"  Index: {block['index']}")
-            print(f"  Hash: {block['hash']}")
-            print(f"  Transactions: {len(block['transactions'])}")
-            print(f"  Miner: {block['miner_address']}")
-            print(f"  Reward: {reward}")
-            print(f"  Nonce: {block['nonce']}")
-        else:
-            print(f"Error mining block: {response.json().get('error', 'Unknown error')}")
-            sys.exit(1)
+        for future in as_completed(futures):
+            try:
+                job = future.result()
+            except requests.RequestException as e:
+                print(f"Error connecting to node: {str(e)}")
+                failures += 1
+                continue
             
-    except requests.RequestException as e:
-        print(f"Error connecting to node: {str(e)}")
+            if job["status"] == "done":
+                _print_mined_block(job["result"])
+            else:
+                print(f"Error mining block: {job.get('error', 'Unknown error')}")
+                failures += 1
+    
+    if failures:
         sys.exit(1)
 
 
+def _format_block(block: Dict[str, Any]) -> str:
+    parts = [
+        f"  Index: {block['index']}\n",
+        f"  Hash: {block['hash']}\n",
+        f"  Previous hash: {block['previous_hash']}\n",
+        f"  Transactions: {len(block['transactions'])}\n"
+    ]
+    if block.get('miner_address'):
+        parts.append(f"  Miner: {block['miner_address']}\n")
+    parts.append(f"  Timestamp: {block['timestamp']}\n\n")
+    return "".join(parts)
+
+
+def _write_raw(data: bytes) -> None:
+    # Pass the node's JSON through untouched for --format json
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.write(b"\n")
+
+
+def _stream_blocks(url: str, params: Dict[str, Any], raw: bool) -> None:
+    # Ask for one block per line and print each as soon as it arrives
+    params = dict(params, format="ndjson")
+    with _SESSION.get(
+        url,
+        params=params,
+        headers={"Accept": "application/x-ndjson"},
+        stream=True,
+        timeout=_FAST_TIMEOUT
+    ) as response:
+        if response.status_code != 200:
+            print(f"Error getting blocks: {_parse(response).get('error', 'Unknown error')}")
+            sys.exit(1)
+            
+        # With --format json the NDJSON lines are written out as received
+        if raw:
+            for line in response.iter_lines():
+                if line:
+                    _write_raw(line)
+            return
+            
+        count = 0
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            sys.stdout.write(_format_block(json_loads(line)))
+            count += 1
+            
+        if count == 0:
+            print("No blocks found")
+        else:
+            print(f"Streamed {count} blocks")
+
+
 def get_blocks(args: argparse.Namespace) -> None:
     try:
         # Connect to local node
-        url = f"http://{args.node}/blocks"
-        if args.start is not None or args.end is not None:
-            params = {}
-            if args.start is not None:
-                params["start"] = args.start
-            if args.end is not None:
-                params["end"] = args.end
-            response = requests.get(url, params=params)
-        else:
-            response = requests.get(url)
+        url = f"{args.base_url}/blocks"
+        params = {}
+        if args.start is not None:
+            params["start"] = args.start
+        if args.end is not None:
+            params["end"] = args.end
+            
+        if args.stream:
+            _stream_blocks(url, params, args.format == "json")
+            return
+            
+        response = _SESSION.get(url, params=params, timeout=_FAST_TIMEOUT)
+        
+        if args.format == "json" and response.status_code == 200:
+            _write_raw(response.content)
+            return
+            
+        body = _parse(response)
         
         if response.status_code == 200:
-            blocks = response.json()["blocks"]
+            blocks = body["blocks"]
             
             if not blocks:
                 print("No blocks found")
                 return
                 
-            print(f"Found {len(blocks)} blocks:")
-            for block in blocks:
-                print(f"  Index: {block['index']}")
-                print(f"  Hash: {block['hash']}")
-                print(f"  Previous hash: {block['previous_hash']}")
-                print(f"  Transactions: {len(block['transactions'])}")
-                if block.get('miner_address'):
-                    print(f"  Miner: {block['miner_address']}")
-                print(f"  Timestamp: {block['timestamp']}")
-                print()
+            # Build the listing in memory and write it out once
+            parts = [f"Found {len(blocks)} blocks:\n"]
+            parts.extend(_format_block(block) for block in blocks)
+            sys.stdout.write("".join(parts))
         else:
-            print(f"Error getting blocks: {response.json().get('error', 'Unknown error')}")
+            print(f"Error getting blocks: {body.get('error', 'Unknown error')}")
             sys.exit(1)
             
     except requests.RequestException as e:
@@ -161,24 +360,32 @@ def get_blocks(args: argparse.Namespace) -> None:
 def get_transactions(args: argparse.Namespace) -> None:
     try:
         # Connect to local node
-        response = requests.get(f"http://{args.node}/transactions")
+        response = _SESSION.get(f"{args.base_url}/transactions", timeout=_FAST_TIMEOUT)
+        
+        if args.format == "json" and response.status_code == 200:
+            _write_raw(response.content)
+            return
+            
+        body = _parse(response)
         
         if response.status_code == 200:
-            transactions = response.json()["transactions"]
+            transactions = body["transactions"]
             
             if not transactions:
                 print("No pending transactions found")
                 return
                 
-            print(f"Found {len(transactions)} pending transactions:")
+            # Build the listing in memory and write it out once
+            parts = [f"Found {len(transactions)} pending transactions:\n"]
             for tx in transactions:
-                print(f"  ID: {tx['txid']}")
-                print(f"  Inputs: {len(tx['inputs'])}")
-                print(f"  Outputs: {len(tx['outputs'])}")
-                print(f"  Status: {tx['status']}")
-                print()
+                parts.append(f"  ID: {tx['txid']}\n")
+                parts.append(f"  Inputs: {len(tx['inputs'])}\n")
+                parts.append(f"  Outputs: {len(tx['outputs'])}\n")
+                parts.append(f"  Status: {tx['status']}\n")
+                parts.append("\n")
+            sys.stdout.write("".join(parts))
         else:
-            print(f"Error getting transactions: {response.json().get('error', 'Unknown error')}")
+            print(f"Error getting transactions: {body.get('error', 'Unknown error')}")
             sys.exit(1)
             
     except requests.RequestException as e:
@@ -188,79 +395,88 @@ def get_transactions(args: argparse.Namespace) -> None:
 
 def debug_transaction(args: argparse.Namespace) -> None:
     try:
-        # Load transaction from file
-        with open(args.file, "r") as f:
-            transaction = json.load(f)
+        # Read the transaction file; its bytes are sent to the node as-is
+        with open(args.file, "rb") as f:
+            raw = f.read()
         
         # Connect to local node
-        response = requests.post(
-            f"http://{args.node}/debug/transaction",
-            json=transaction
+        response = _SESSION.post(
+            f"{args.base_url}/debug/transaction",
+            data=raw,
+            headers=_JSON_HEADERS,
+            timeout=_FAST_TIMEOUT
         )
+        body = _parse(response)
         
         if response.status_code == 200:
-            debug_info = response.json()["validation_result"]
-            print("Transaction Debug Information:")
+            debug_info = body["validation_result"]
+            
+            # Build the report in memory and write it out once
+            parts = ["Transaction Debug Information:\n"]
             
             if debug_info["validation_result"] == "Success":
-                print("✅ Transaction is valid")
+                parts.append("✅ Transaction is valid\n")
             else:
-                print("❌ Transaction has errors:")
+                parts.append("❌ Transaction has errors:\n")
                 if debug_info["error"]:
-                    print(f"  Error: {debug_info['error']}")
+                    parts.append(f"  Error: {debug_info['error']}\n")
             
             # Print input details
-            print("\nInputs:")
+            parts.append("\nInputs:\n")
             if not debug_info["input_details"]:
-                print("  No inputs found")
+                parts.append("  No inputs found\n")
             else:
                 for i, input_info in enumerate(debug_info["input_details"]):
-                    print(f"  Input {i+1}:")
-                    print(f"    TXID: {input_info['txid']}")
-                    print(f"    Vout: {input_info['vout']}")
+                    parts.append(f"  Input {i+1}:\n")
+                    parts.append(f"    TXID: {input_info['txid']}\n")
+                    parts.append(f"    Vout: {input_info['vout']}\n")
                     
                     if input_info.get("error"):
-                        print(f"    ❌ Error: {input_info['error']}")
+                        parts.append(f"    ❌ Error: {input_info['error']}\n")
                     else:
-                        print(f"    Found: {'✅' if input_info['found'] else '❌'}")
+                        parts.append(f"    Found: {'✅' if input_info['found'] else '❌'}\n")
                         if input_info['found']:
-                            print(f"    Amount: {input_info['amount']}")
-                            print(f"    Address: {input_info['address']}")
-                            print(f"    Already spent: {'❌ Yes' if input_info['spent'] else '✅ No'}")
-                            print(f"    Signature valid: {'✅' if input_info['signature_valid'] else '❌'}")
+                            parts.append(f"    Amount: {input_info['amount']}\n")
+                            parts.append(f"    Address: {input_info['address']}\n")
+                            parts.append(f"    Already spent: {'❌ Yes' if input_info['spent'] else '✅ No'}\n")
+                            parts.append(f"    Signature valid: {'✅' if input_info['signature_valid'] else '❌'}\n")
             
             # Print output details
-            print("\nOutputs:")
+            parts.append("\nOutputs:\n")
             if not debug_info["output_details"]["outputs"]:
-                print("  No outputs found")
+                parts.append("  No outputs found\n")
             else:
                 for output_info in debug_info["output_details"]["outputs"]:
-                    print(f"  Output {output_info['index']+1}:")
-                    print(f"    Address: {output_info['address']}")
-                    print(f"    Amount: {output_info['amount']}")
+                    parts.append(f"  Output {output_info['index']+1}:\n")
+                    parts.append(f"    Address: {output_info['address']}\n")
+                    parts.append(f"    Amount: {output_info['amount']}\n")
                     
                     if not output_info["valid"]:
-                        print(f"    ❌ Error: {output_info.get('error', 'Invalid output')}")
+                        parts.append(f"    ❌ Error: {output_info.get('error', 'Invalid output')}\n")
             
             # Print balance details
-            print("\nBalance:")
-            print(f"  Total inputs: {debug_info['balance']['input_total']}")
-            print(f"  Total outputs: {debug_info['balance']['output_total']}")
+            parts.append("\nBalance:\n")
+            parts.append(f"  Total inputs: {debug_info['balance']['input_total']}\n")
+            parts.append(f"  Total outputs: {debug_info['balance']['output_total']}\n")
             
             # Check if inputs cover outputs
             if debug_info["balance"]["input_total"] >= debug_info["balance"]["output_total"]:
-                print(f"  ✅ Sufficient funds (Fee: {debug_info['balance']['fee']})")
+                parts.append(f"  ✅ Sufficient funds (Fee: {debug_info['balance']['fee']})\n")
             else:
-                print(f"  ❌ Insufficient funds (Shortfall: {debug_info['balance']['output_total'] - debug_info['balance']['input_total']})")
+                parts.append(f"  ❌ Insufficient funds (Shortfall: {debug_info['balance']['output_total'] - debug_info['balance']['input_total']})\n")
+            
+            sys.stdout.write("".join(parts))
                 
         else:
-            print(f"Error debugging transaction: {response.json().get('error', 'Unknown error')}")
+            # Report a malformed file as such rather than as a node error
+            json_loads(raw)
+            print(f"Error debugging transaction: {body.get('error', 'Unknown error')}")
             sys.exit(1)
             
     except FileNotFoundError:
         print(f"Error: Transaction file not found: {args.file}")
         sys.exit(1)
-    except json.JSONDecodeError:
+    except JSONDecodeError:
         print(f"Error: Invalid JSON in transaction file: {args.file}")
         sys.exit(1)
     except requests.RequestException as e:
@@ -270,22 +486,27 @@ def debug_transaction(args: argparse.Namespace) -> None:
 
 def send_transaction(args: argparse.Namespace) -> None:
     try:
-        # Load transaction from file
-        with open(args.file, "r") as f:
-            transaction = json.load(f)
+        # Read the transaction file; its bytes are sent to the node as-is
+        with open(args.file, "rb") as f:
+            raw = f.read()
         
         # Connect to local node
-        response = requests.post(
-            f"http://{args.node}/transactions",
-            json=transaction
+        response = _SESSION.post(
+            f"{args.base_url}/transactions",
+            data=raw,
+            headers=_JSON_HEADERS,
+            timeout=_FAST_TIMEOUT
         )
+        body = _parse(response)
         
         if response.status_code == 200:
-            tx_id = response.json()["transaction_id"]
+            tx_id = body["transaction_id"]
             print(f"Transaction sent successfully")
             print(f"Transaction ID: {tx_id}")
         else:
-            error_msg = response.json().get('error', 'Unknown error')
+            # Report a malformed file as such rather than as a node error
+            json_loads(raw)
+            error_msg = body.get('error', 'Unknown error')
             print(f"Error sending transaction: {error_msg}")
             print("\nTry running with 'debug' command to get more information:")
             print(f"  kaidos-node debug {args.file} --node {args.node}")
@@ -294,7 +515,7 @@ def send_transaction(args: argparse.Namespace) -> None:
     except FileNotFoundError:
         print(f"Error: Transaction file not found: {args.file}")
         sys.exit(1)
-    except json.JSONDecodeError:
+    except JSONDecodeError:
         print(f"Error: Invalid JSON in transaction file: {args.file}")
         sys.exit(1)
     except requests.RequestException as e:
@@ -302,13 +523,56 @@ def send_transaction(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
+def _load_utxo_cache() -> Dict[str, Any]:
+    try:
+        with open(_UTXO_CACHE_PATH, "rb") as f:
+            return json_loads(f.read())
+    except (OSError, JSONDecodeError):
+        return {}
+
+
+def _save_utxo_cache(cache: Dict[str, Any]) -> None:
+    # The cache is only an optimization, so failing to write it is not an error
+    try:
+        os.makedirs(os.path.dirname(_UTXO_CACHE_PATH), exist_ok=True)
+        with open(_UTXO_CACHE_PATH, "wb") as f:
+            f.write(json_dumps(cache))
+    except OSError:
+        pass
+
+
 def get_utxos(args: argparse.Namespace) -> None:
     try:
-        # Connect to local node
-        response = requests.get(f"http://{args.node}/utxos/{args.address}")
+        cache = _load_utxo_cache()
+        cache_key = f"{args.node}/{args.address}"
+        cached = cache.get(cache_key)
         
-        if response.status_code == 200:
-            result = response.json()
+        # Connect to local node, revalidating any cached response
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+        response = _SESSION.get(
+            f"{args.base_url}/utxos/{args.address}",
+            headers=headers,
+            timeout=_FAST_TIMEOUT
+        )
+        
+        if response.status_code == 304 and cached:
+            raw = cached["body"].encode("utf-8")
+        elif response.status_code == 200:
+            raw = response.content
+            
+            etag = response.headers.get("ETag")
+            if etag:
+                cache[cache_key] = {"etag": etag, "body": response.text}
+                _save_utxo_cache(cache)
+        else:
+            raw = None
+            
+        if raw is not None and args.format == "json":
+            _write_raw(raw)
+            return
+        
+        if raw is not None:
+            result = json_loads(raw)
             utxos = result["utxos"]
             balance = result["balance"]
             
@@ -316,16 +580,18 @@ def get_utxos(args: argparse.Namespace) -> None:
                 print(f"No UTXOs found for {args.address}")
                 return
                 
-            print(f"Found {len(utxos)} UTXOs for {args.address}:")
+            # Build the listing in memory and write it out once
+            parts = [f"Found {len(utxos)} UTXOs for {args.address}:\n"]
             for utxo in utxos:
-                print(f"  TXID: {utxo['txid'][:8]}...:{utxo['vout']}")
-                print(f"  Amount: {utxo['amount']}")
-                print(f"  Created: {utxo['created_at']}")
-                print()
+                parts.append(f"  TXID: {utxo['txid'][:8]}...:{utxo['vout']}\n")
+                parts.append(f"  Amount: {utxo['amount']}\n")
+                parts.append(f"  Created: {utxo['created_at']}\n")
+                parts.append("\n")
                 
-            print(f"Total balance: {balance}")
+            parts.append(f"Total balance: {balance}\n")
+            sys.stdout.write("".join(parts))
         else:
-            print(f"Error getting UTXOs: {response.json().get('error', 'Unknown error')}")
+            print(f"Error getting UTXOs: {_parse(response).get('error', 'Unknown error')}")
             sys.exit(1)
             
     except requests.RequestException as e:
@@ -336,16 +602,115 @@ def get_utxos(args: argparse.Namespace) -> None:
 def consensus(args: argparse.Namespace) -> None:
     try:
         # Connect to local node
-        response = requests.get(f"http://{args.node}/consensus")
+        response = _SESSION.get(f"{args.base_url}/consensus", timeout=_SYNC_TIMEOUT)
+        body = _parse(response)
+        
+        if response.status_code == 200:
+            print(f"Consensus result: {body['message']}")
+            print(f"Chain length: {body.get('length') or body.get('new_length')}")
+        else:
+            print(f"Error running consensus: {body.get('error', 'Unknown error')}")
+            sys.exit(1)
+            
+    except requests.RequestException as e:
+        print(f"Error connecting to node: {str(e)}")
+        sys.exit(1)
+
+
+def batch_request(args: argparse.Namespace) -> None:
+    try:
+        # Load calls from file
+        with open(args.file, "rb") as f:
+            calls = json_loads(f.read())
+        
+        if not isinstance(calls, list):
+            print(f"Error: Batch file must contain a list of calls: {args.file}")
+            sys.exit(1)
+            
+        # Number calls that don't carry their own id so responses can be matched
+        for i, call in enumerate(calls):
+            if isinstance(call, dict):
+                call.setdefault("id", i)
+        
+        # Send every call in a single round trip
+        response = _post_json(
+            f"{args.base_url}/batch",
+            calls,
+            timeout=_FAST_TIMEOUT
+        )
+        body = _parse(response)
+        
+        if response.status_code == 200:
+            results = body
+            
+            print(f"Batch completed ({len(results)} calls):")
+            for call, result in zip(calls, results):
+                method = call.get('method') if isinstance(call, dict) else None
+                print(f"  Call {result['id']} ({method}):")
+                if "error" in result:
+                    print(f"    Error: {result['error']}")
+                else:
+                    print(json_dumps(result["result"], indent=True).decode())
+                print()
+        else:
+            print(f"Error running batch: {body.get('error', 'Unknown error')}")
+            sys.exit(1)
+            
+    except FileNotFoundError:
+        print(f"Error: Batch file not found: {args.file}")
+        sys.exit(1)
+    except JSONDecodeError:
+        print(f"Error: Invalid JSON in batch file: {args.file}")
+        sys.exit(1)
+    except requests.RequestException as e:
+        print(f"Error connecting to node: {str(e)}")
+        sys.exit(1)
+
+
+def chain_request(args: argparse.Namespace) -> None:
+    try:
+        # Load calls from file
+        with open(args.file, "rb") as f:
+            calls = json_loads(f.read())
+        
+        if not isinstance(calls, list):
+            print(f"Error: Chain file must contain a list of calls: {args.file}")
+            sys.exit(1)
+        
+        # The node runs the calls in dependency order, forwarding each result
+        # to the calls that name it in input_from
+        response = _post_json(
+            f"{args.base_url}/batch/chain",
+            calls,
+            timeout=_MINE_TIMEOUT
+        )
+        body = _parse(response)
         
         if response.status_code == 200:
-            result = response.json()
-            print(f"Consensus result: {result['message']}")
-            print(f"Chain length: {result.get('length') or result.get('new_length')}")
+            results = body
+            
+            print(f"Chain completed ({len(results)} calls):")
+            for call, result in zip(calls, results):
+                method = call.get('method') if isinstance(call, dict) else None
+                print(f"  Call {result['call_id']} ({method}):")
+                if "error" in result:
+                    print(f"    Error: {result['error']}")
+                else:
+                    print(json_dumps(result["result"], indent=True).decode())
+                print()
+            
+            if any("error" in result for result in results):
+                sys.exit(1)
         else:
-            print(f"Error running consensus: {response.json().get('error', 'Unknown error')}")
+            print(f"Error running chain: {body.get('error', 'Unknown error')}")
             sys.exit(1)
             
+    except FileNotFoundError:
+        print(f"Error: Chain file not found: {args.file}")
+        sys.exit(1)
+    except JSONDecodeError:
+        print(f"Error: Invalid JSON in chain file: {args.file}")
+        sys.exit(1)
     except requests.RequestException as e:
         print(f"Error connecting to node: {str(e)}")
         sys.exit(1)
@@ -357,9 +722,11 @@ def main() -> None:
     
     # Initialize node command
     init_parser = subparsers.add_parser("init", help="Initialize a new node")
+    init_parser.set_defaults(func=init_node)
     
     # Start node command
     start_parser = subparsers.add_parser("start", help="Start a node server")
+    start_parser.set_defaults(func=start_node)
     start_parser.add_argument(
         "--host", 
         default="0.0.0.0", 
@@ -371,18 +738,27 @@ def main() -> None:
         default=5000, 
         help="Port to bind to (default: 5000)"
     )
+    start_parser.add_argument(
+        "--mining-processes", 
+        type=int, 
+        default=1, 
+        help="Worker processes used to search for nonces (default: 1)"
+    )
     
     # Add peer command
     add_peer_parser = subparsers.add_parser("add-peer", help="Add a peer to the network")
+    add_peer_parser.set_defaults(func=add_peer)
     add_peer_parser.add_argument(
         "--node", 
-        default="localhost:5000", 
-        help="Local node address (default: localhost:5000)"
+        action="append", 
+        default=None, 
+        help="Node address, may be repeated (default: localhost:5000)"
     )
     add_peer_parser.add_argument("peer", help="Peer address (host:port)")
     
     # List peers command
     list_peers_parser = subparsers.add_parser("list-peers", help="List all peers")
+    list_peers_parser.set_defaults(func=list_peers)
     list_peers_parser.add_argument(
         "--node", 
         default="localhost:5000", 
@@ -391,6 +767,7 @@ def main() -> None:
     
     # Mine block command
     mine_parser = subparsers.add_parser("mine", help="Mine a new block")
+    mine_parser.set_defaults(func=mine_block)
     mine_parser.add_argument(
         "--node", 
         default="localhost:5000", 
@@ -400,9 +777,22 @@ def main() -> None:
         "address",
         help="Miner's wallet address to receive rewards"
     )
+    mine_parser.add_argument(
+        "--count", 
+        type=int, 
+        default=1, 
+        help="Number of blocks to mine (default: 1)"
+    )
+    mine_parser.add_argument(
+        "--concurrency", 
+        type=int, 
+        default=1, 
+        help="Maximum number of mining requests in flight (default: 1)"
+    )
     
     # Get blocks command
     blocks_parser = subparsers.add_parser("blocks", help="Get blockchain blocks")
+    blocks_parser.set_defaults(func=get_blocks)
     blocks_parser.add_argument(
         "--node", 
         default="localhost:5000", 
@@ -418,17 +808,36 @@ def main() -> None:
         type=int, 
         help="End index (inclusive)"
     )
+    blocks_parser.add_argument(
+        "--stream", 
+        action="store_true", 
+        help="Stream blocks one at a time instead of loading the whole range"
+    )
+    blocks_parser.add_argument(
+        "--format", 
+        choices=["human", "json"], 
+        default="human", 
+        help="Output format; json prints the node's response as-is (default: human)"
+    )
     
     # Get transactions command
     tx_parser = subparsers.add_parser("transactions", help="Get pending transactions")
+    tx_parser.set_defaults(func=get_transactions)
     tx_parser.add_argument(
         "--node", 
         default="localhost:5000", 
         help="Local node address (default: localhost:5000)"
     )
+    tx_parser.add_argument(
+        "--format", 
+        choices=["human", "json"], 
+        default="human", 
+        help="Output format; json prints the node's response as-is (default: human)"
+    )
     
     # Debug transaction command
     debug_parser = subparsers.add_parser("debug", help="Debug a transaction")
+    debug_parser.set_defaults(func=debug_transaction)
     debug_parser.add_argument(
         "--node", 
         default="localhost:5000", 
@@ -438,6 +847,7 @@ def main() -> None:
     
     # Send transaction command
     send_parser = subparsers.add_parser("send", help="Send a transaction")
+    send_parser.set_defaults(func=send_transaction)
     send_parser.add_argument(
         "--node", 
         default="localhost:5000", 
@@ -447,45 +857,57 @@ def main() -> None:
     
     # Get UTXOs command
     utxos_parser = subparsers.add_parser("utxos", help="Get UTXOs for an address")
+    utxos_parser.set_defaults(func=get_utxos)
     utxos_parser.add_argument(
         "--node", 
         default="localhost:5000", 
         help="Local node address (default: localhost:5000)"
     )
     utxos_parser.add_argument("address", help="Wallet address")
+    utxos_parser.add_argument(
+        "--format", 
+        choices=["human", "json"], 
+        default="human", 
+        help="Output format; json prints the node's response as-is (default: human)"
+    )
     
     # Consensus command
     consensus_parser = subparsers.add_parser("consensus", help="Run consensus algorithm")
+    consensus_parser.set_defaults(func=consensus)
     consensus_parser.add_argument(
         "--node", 
         default="localhost:5000", 
         help="Local node address (default: localhost:5000)"
     )
     
+    # Batch query command
+    batch_parser = subparsers.add_parser("batch", help="Run several queries in one request")
+    batch_parser.set_defaults(func=batch_request)
+    batch_parser.add_argument(
+        "--node", 
+        default="localhost:5000", 
+        help="Local node address (default: localhost:5000)"
+    )
+    batch_parser.add_argument("file", help="Batch file (JSON list of {method, params} calls)")
+    
+    # Chained request command
+    chain_parser = subparsers.add_parser("chain", help="Run dependent calls in one request")
+    chain_parser.set_defaults(func=chain_request)
+    chain_parser.add_argument(
+        "--node", 
+        default="localhost:5000", 
+        help="Local node address (default: localhost:5000)"
+    )
+    chain_parser.add_argument("file", help="Chain file (JSON list of {call_id, method, payload, input_from} calls)")
+    
     args = parser.parse_args()
     
-    if args.command == "init":
-        init_node(args)
-    elif args.command == "start":
-        start_node(args)
-    elif args.command == "add-peer":
-        add_peer(args)
-    elif args.command == "list-peers":
-        list_peers(args)
-    elif args.command == "mine":
-        mine_block(args)
-    elif args.command == "blocks":
-        get_blocks(args)
-    elif args.command == "transactions":
-        get_transactions(args)
-    elif args.command == "debug":
-        debug_transaction(args)
-    elif args.command == "send":
-        send_transaction(args)
-    elif args.command == "utxos":
-        get_utxos(args)
-    elif args.command == "consensus":
-        consensus(args)
+    # Build the node's base URL once; add-peer takes a list of nodes instead
+    if isinstance(getattr(args, "node", None), str):
+        args.base_url = f"http://{args.node}"
+    
+    if hasattr(args, "func"):
+        args.func(args)
     else:
         parser.print_help()
 
@@ -1,16 +1,20 @@
 import argparse
 import getpass
 import sys
-import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, TYPE_CHECKING
 
-from Kaidos.wallet.wallet import Wallet
-from Kaidos.core.exceptions import KeyGenerationError, SignatureError
+from Kaidos.core.serialization import json_dumps, json_loads
 
+# The wallet stack pulls in the database driver and crypto libraries, so it is
+# imported where a command needs it rather than when the CLI starts
+if TYPE_CHECKING:
+    from Kaidos.wallet.wallet import Wallet
 
-def create_wallet(args: argparse.Namespace) -> None:
-    wallet = Wallet()
+
+def create_wallet(args: argparse.Namespace, wallet: "Wallet") -> None:
+    from Kaidos.core.exceptions import KeyGenerationError
     
     try:
         # Check if passphrase is required
@@ -39,69 +43,59 @@ def create_wallet(args: argparse.Namespace) -> None:
     except KeyGenerationError as e:
         print(f"Error creating wallet: {str(e)}")
         sys.exit(1)
-    finally:
-        wallet.close()
 
 
-def list_wallets(args: argparse.Namespace) -> None:
-    wallet = Wallet()
+def list_wallets(args: argparse.Namespace, wallet: "Wallet") -> None:
+    wallets = wallet.list_wallets()
     
-    try:
-        wallets = wallet.list_wallets()
+    if not wallets:
+        print("No wallets found")
+        return
         
-        if not wallets:
-            print("No wallets found")
-            return
-            
-        print(f"Found {len(wallets)} wallets:")
-        for w in wallets:
-            print(f"  Wallet ID: {w['wallet_id']}")
-            print(f"  Name: {w.get('name', 'Unnamed Wallet')}")
-            print(f"  Encrypted: {w.get('encrypted', False)}")
-            print(f"  Created: {w.get('created_at', 'Unknown')}")
-            
-            # Display addresses for this wallet
-            if 'addresses' in w and w['addresses']:
-                print(f"  Addresses ({len(w['addresses'])}):")
-                total_balance = 0
-                for addr in w['addresses']:
-                    balance = wallet.get_balance(addr['address'])
-                    total_balance += balance
-                    print(f"    - {addr['address']} (Balance: {balance})")
-                print(f"  Total Balance: {total_balance}")
-            else:
-                print("  No addresses found")
-            print()
-            
-    finally:
-        wallet.close()
+    # Look up every address's balance in one go
+    balances = wallet.get_balances([
+        addr['address'] for w in wallets for addr in w.get('addresses', [])
+    ])
+        
+    # Build the listing in memory and write it out once
+    parts = [f"Found {len(wallets)} wallets:\n"]
+    for w in wallets:
+        parts.append(f"  Wallet ID: {w['wallet_id']}\n")
+        parts.append(f"  Name: {w.get('name', 'Unnamed Wallet')}\n")
+        parts.append(f"  Encrypted: {w.get('encrypted', False)}\n")
+        parts.append(f"  Created: {w.get('created_at', 'Unknown')}\n")
+        
+        # Display addresses for this wallet
+        if 'addresses' in w and w['addresses']:
+            parts.append(f"  Addresses ({len(w['addresses'])}):\n")
+            for addr in w['addresses']:
+                parts.append(f"    - {addr['address']} (Balance: {balances[addr['address']]})\n")
+            total_balance = sum(balances[addr['address']] for addr in w['addresses'])
+            parts.append(f"  Total Balance: {total_balance}\n")
+        else:
+            parts.append("  No addresses found\n")
+        parts.append("\n")
+    sys.stdout.write("".join(parts))
 
 
-def get_balance(args: argparse.Namespace) -> None:
-    wallet = Wallet()
-    
-    try:
-        balance = wallet.get_balance(args.address)
-        print(f"Balance for {args.address}: {balance}")
-    finally:
-        wallet.close()
+def get_balance(args: argparse.Namespace, wallet: "Wallet") -> None:
+    balance = wallet.get_balance(args.address)
+    print(f"Balance for {args.address}: {balance}")
 
 
-def create_transaction(args: argparse.Namespace) -> None:
-    wallet = Wallet()
+def create_transaction(args: argparse.Namespace, wallet: "Wallet") -> None:
+    from Kaidos.core.exceptions import SignatureError
     
     try:
         # Get address data
-        address_data = wallet.addresses.find_one({"address": args.sender})
-        if not address_data:
-            print(f"Error: Sender address not found: {args.sender}")
-            sys.exit(1)
-            
-        # Get wallet
-        w = wallet.get_wallet(address_data["wallet_id"])
-        if not w:
-            print(f"Error: Wallet not found for address: {args.sender}")
+        found = wallet.lookup_address_with_wallet(args.sender)
+        if not found:
+            if not wallet.lookup_address(args.sender):
+                print(f"Error: Sender address not found: {args.sender}")
+            else:
+                print(f"Error: Wallet not found for address: {args.sender}")
             sys.exit(1)
+        _, w = found
             
         # Check if wallet is encrypted
         if w.get('encrypted', False):
@@ -130,15 +124,13 @@ def create_transaction(args: argparse.Namespace) -> None:
         
         # Save to file if requested
         if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(tx, f, indent=2)
+            with open(args.output, 'wb') as f:
+                f.write(json_dumps(tx, indent=True))
             print(f"Transaction saved to {args.output}")
         
     except SignatureError as e:
         print(f"Error creating transaction: {str(e)}")
         sys.exit(1)
-    finally:
-        wallet.close()
 
 
 def get_utxos(args: argparse.Namespace) -> None:
@@ -167,8 +159,8 @@ def get_utxos(args: argparse.Namespace) -> None:
         tx_manager.close()
 
 
-def create_address(args: argparse.Namespace) -> None:
-    wallet = Wallet()
+def create_address(args: argparse.Namespace, wallet: "Wallet") -> None:
+    from Kaidos.core.exceptions import KeyGenerationError
     
     try:
         # Check if wallet is encrypted
@@ -192,47 +184,42 @@ def create_address(args: argparse.Namespace) -> None:
     except KeyGenerationError as e:
         print(f"Error creating address: {str(e)}")
         sys.exit(1)
-    finally:
-        wallet.close()
 
 
-def list_addresses(args: argparse.Namespace) -> None:
-    wallet = Wallet()
+def list_addresses(args: argparse.Namespace, wallet: "Wallet") -> None:
+    # Check if wallet exists
+    w = wallet.get_wallet(args.wallet_id)
+    if not w:
+        print(f"Error: Wallet not found with ID: {args.wallet_id}")
+        sys.exit(1)
+        
+    addresses = wallet.list_addresses(args.wallet_id)
     
-    try:
-        # Check if wallet exists
-        w = wallet.get_wallet(args.wallet_id)
-        if not w:
-            print(f"Error: Wallet not found with ID: {args.wallet_id}")
-            sys.exit(1)
-            
-        addresses = wallet.list_addresses(args.wallet_id)
+    if not addresses:
+        print(f"No addresses found for wallet: {args.wallet_id}")
+        return
         
-        if not addresses:
-            print(f"No addresses found for wallet: {args.wallet_id}")
-            return
-            
-        print(f"Found {len(addresses)} addresses for wallet {args.wallet_id}:")
-        for addr in addresses:
-            print(f"  Address: {addr['address']}")
-            balance = wallet.get_balance(addr['address'])
-            print(f"  Balance: {balance}")
-            print(f"  Created: {addr.get('created_at', 'Unknown')}")
-            print()
-            
-    finally:
-        wallet.close()
+    balances = wallet.get_balances([addr['address'] for addr in addresses])
+    
+    parts = [f"Found {len(addresses)} addresses for wallet {args.wallet_id}:\n"]
+    for addr in addresses:
+        parts.append(f"  Address: {addr['address']}\n")
+        parts.append(f"  Balance: {balances[addr['address']]}\n")
+        parts.append(f"  Created: {addr.get('created_at', 'Unknown')}\n")
+        parts.append("\n")
+    sys.stdout.write("".join(parts))
 
 
-def create_multisig(args: argparse.Namespace) -> None:
-    wallet = Wallet()
-    
+def _read_key_file(key_file: str) -> str:
+    with open(key_file, 'r') as f:
+        return f.read().strip()
+
+
+def create_multisig(args: argparse.Namespace, wallet: "Wallet") -> None:
     try:
-        # Parse public keys
-        public_keys = []
-        for key_file in args.public_keys:
-            with open(key_file, 'r') as f:
-                public_keys.append(f.read().strip())
+        # Read the public key files concurrently, keeping their order
+        with ThreadPoolExecutor(max_workers=min(16, len(args.public_keys))) as pool:
+            public_keys = list(pool.map(_read_key_file, args.public_keys))
         
         # Create multisig address
         from Kaidos.wallet.multisig import MultiSigWallet
@@ -256,29 +243,23 @@ def create_multisig(args: argparse.Namespace) -> None:
     except Exception as e:
         print(f"Error creating multi-signature address: {str(e)}")
         sys.exit(1)
-    finally:
-        wallet.close()
 
 
-def sign_multisig_tx(args: argparse.Namespace) -> None:
-    wallet = Wallet()
-    
+def sign_multisig_tx(args: argparse.Namespace, wallet: "Wallet") -> None:
     try:
         # Load transaction from file
-        with open(args.transaction, 'r') as f:
-            tx_data = json.load(f)
+        with open(args.transaction, 'rb') as f:
+            tx_data = json_loads(f.read())
         
         # Get wallet for the key
-        address_data = wallet.addresses.find_one({"address": args.address})
-        if not address_data:
-            print(f"Error: Address not found: {args.address}")
-            sys.exit(1)
-            
-        # Get wallet
-        w = wallet.get_wallet(address_data["wallet_id"])
-        if not w:
-            print(f"Error: Wallet not found for address: {args.address}")
+        found = wallet.lookup_address_with_wallet(args.address)
+        if not found:
+            if not wallet.lookup_address(args.address):
+                print(f"Error: Address not found: {args.address}")
+            else:
+                print(f"Error: Wallet not found for address: {args.address}")
             sys.exit(1)
+        address_data, w = found
             
         # Check if wallet is encrypted
         if w.get('encrypted', False):
@@ -318,8 +299,8 @@ def sign_multisig_tx(args: argparse.Namespace) -> None:
         })
         
         # Save updated transaction
-        with open(args.output or args.transaction, 'w') as f:
-            json.dump(tx_data, f, indent=2)
+        with open(args.output or args.transaction, 'wb') as f:
+            f.write(json_dumps(tx_data, indent=True))
             
         print(f"Transaction signed successfully!")
         print(f"Signature added for input {args.txid}:{args.vout} with key index {args.key_index}")
@@ -328,8 +309,6 @@ def sign_multisig_tx(args: argparse.Namespace) -> None:
     except Exception as e:
         print(f"Error signing transaction: {str(e)}")
         sys.exit(1)
-    finally:
-        wallet.close()
 
 
 def main() -> None:
@@ -402,26 +381,35 @@ def main() -> None:
     
     args = parser.parse_args()
     
-    if args.command == "create":
-        create_wallet(args)
-    elif args.command == "list":
-        list_wallets(args)
-    elif args.command == "balance":
-        get_balance(args)
-    elif args.command == "address":
-        create_address(args)
-    elif args.command == "addresses":
-        list_addresses(args)
-    elif args.command == "tx":
-        create_transaction(args)
-    elif args.command == "utxos":
-        get_utxos(args)
-    elif args.command == "multisig":
-        create_multisig(args)
-    elif args.command == "sign-multisig":
-        sign_multisig_tx(args)
-    else:
+    if args.command is None:
         parser.print_help()
+        return
+        
+    # utxos only reads the chain database
+    if args.command == "utxos":
+        get_utxos(args)
+        return
+    
+    # Every other command shares one wallet database handle
+    from Kaidos.wallet.wallet import Wallet
+    
+    with Wallet() as wallet:
+        if args.command == "create":
+            create_wallet(args, wallet)
+        elif args.command == "list":
+            list_wallets(args, wallet)
+        elif args.command == "balance":
+            get_balance(args, wallet)
+        elif args.command == "address":
+            create_address(args, wallet)
+        elif args.command == "addresses":
+            list_addresses(args, wallet)
+        elif args.command == "tx":
+            create_transaction(args, wallet)
+        elif args.command == "multisig":
+            create_multisig(args, wallet)
+        elif args.command == "sign-multisig":
+            sign_multisig_tx(args, wallet)
 
 
 if __name__ == "__main__":
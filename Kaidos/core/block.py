@@ -1,13 +1,140 @@
+import functools
 import hashlib
 import json
+import multiprocessing
+import queue
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from Kaidos.core.merkle_tree import MerkleTree
 
 
+def _encode_value(value: Any) -> str:
+    # Header fields are ints, None, or hex/address/timestamp strings that need no
+    # escaping; those are formatted directly and anything else goes through json.dumps
+    if value is None:
+        return "null"
+    if type(value) is int:
+        return "%d" % value
+    if type(value) is str and value.isascii() and value.isprintable() and '"' not in value and "\\" not in value:
+        return '"%s"' % value
+    return json.dumps(value)
+
+
+# typed=True keeps 1, 1.0 and True apart; they are equal as keys but json.dumps
+# encodes each of them differently
+@functools.lru_cache(maxsize=1024, typed=True)
+def _header_parts(
+    index: int,
+    merkle_root: Optional[str],
+    miner_address: Optional[str],
+    previous_hash: str,
+    timestamp: str
+) -> Tuple[bytes, bytes]:
+    # The header serialized as json.dumps(sort_keys=True) would, split around the
+    # nonce value. Keys are in sorted order and each value is encoded as json.dumps
+    # would encode it, so prefix + nonce + suffix is byte-identical to the full
+    # serialization.
+    prefix = '{"index": %s, "merkle_root": %s, "miner_address": %s, "nonce": ' % (
+        _encode_value(index),
+        _encode_value(merkle_root),
+        _encode_value(miner_address)
+    )
+    suffix = ', "previous_hash": %s, "timestamp": %s}' % (
+        _encode_value(previous_hash),
+        _encode_value(timestamp)
+    )
+    return prefix.encode(), suffix.encode()
+
+
+@functools.lru_cache(maxsize=None)
+def _target_bytes(difficulty: int) -> bytes:
+    # A digest meets the target when, read as a big-endian integer, it is below
+    # 2 ** (256 - 4 * difficulty). Digests are 32 bytes, so comparing against the
+    # same bound as 32 bytes orders them identically in a single compare.
+    if difficulty <= 0:
+        # Every digest qualifies; a longer run of 0xff sorts after all of them
+        return b"\xff" * 33
+    return (1 << (256 - 4 * difficulty)).to_bytes(32, "big")
+
+
+def _search_nonces(
+    prefix: bytes,
+    suffix: bytes,
+    difficulty: int,
+    nonce: int,
+    stride: int = 1,
+    found=None,
+    results=None
+) -> Optional[Tuple[int, str]]:
+    # Try nonce, nonce + stride, ... until a hash meets the target. When run in a
+    # worker process, the winner is reported on results and found stops the others.
+    copy = hashlib.sha256(prefix).copy
+    
+    # The bound for this difficulty is computed once and cached across sessions
+    target = _target_bytes(difficulty)
+    
+    while found is None or not found.is_set():
+        # Check for cancellation only every few thousand attempts
+        for _ in range(4096):
+            sha = copy()
+            sha.update(b"%d%s" % (nonce, suffix))
+            digest = sha.digest()
+            if digest < target:
+                result = (nonce, digest.hex())
+                if results is not None:
+                    results.put(result)
+                if found is not None:
+                    found.set()
+                return result
+            nonce += stride
+    
+    return None
+
+
+def _search_nonces_parallel(
+    prefix: bytes,
+    suffix: bytes,
+    difficulty: int,
+    nonce: int,
+    processes: int
+) -> Tuple[int, str]:
+    # Worker k searches nonce + k, nonce + k + processes, ... so stripes never overlap
+    # Spawn rather than fork: the node mines from a threaded server, and a forked
+    # child can inherit locks that other threads held at the time
+    ctx = multiprocessing.get_context("spawn")
+    found = ctx.Event()
+    results = ctx.Queue()
+    
+    workers = [
+        ctx.Process(
+            target=_search_nonces,
+            args=(prefix, suffix, difficulty, nonce + k, processes, found, results),
+            daemon=True
+        )
+        for k in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    
+    try:
+        while True:
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError("Mining workers exited without a result")
+    finally:
+        found.set()
+        for worker in workers:
+            worker.join()
+
+
 class Block:
     
+    # Below this difficulty starting worker processes costs more than it saves
+    PARALLEL_MIN_DIFFICULTY = 4
+    
     def __init__(
         self, 
         index: int, 
@@ -29,24 +156,39 @@ class Block:
         self.hash = hash or self.compute_hash()
     
     def compute_hash(self) -> str:
-        block_data = {
-            "index": self.index,
-            "merkle_root": self.merkle_root,
-            "previous_hash": self.previous_hash,
-            "timestamp": self.timestamp,
-            "nonce": self.nonce,
-            "miner_address": self.miner_address
-        }
-        
-        block_string = json.dumps(block_data, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        # The template is cached per header fields, so any field change picks a new one
+        prefix, suffix = self._header_template()
+        nonce = self.nonce
+        if type(nonce) is int:
+            return hashlib.sha256(b"%s%d%s" % (prefix, nonce, suffix)).hexdigest()
+        return hashlib.sha256(prefix + _encode_value(nonce).encode() + suffix).hexdigest()
+    
+    def _header_template(self) -> Tuple[bytes, bytes]:
+        # Cached by header fields; blocks are stored via __dict__, so nothing is kept on self
+        return _header_parts(
+            self.index,
+            self.merkle_root,
+            self.miner_address,
+            self.previous_hash,
+            self.timestamp
+        )
     
-    def mine_block(self, difficulty: int) -> None:
-        target = '0' * difficulty
+    def mine_block(self, difficulty: int, processes: int = 1) -> None:
+        # A hash meets the target when its leading difficulty hex digits are zero
+        if int(self.hash, 16) < 1 << (256 - 4 * difficulty):
+            return
         
-        while not self.hash.startswith(target):
-            self.nonce += 1
-            self.hash = self.compute_hash()
+        # Only the nonce changes between attempts, so serialize the rest once;
+        # the search absorbs the prefix into a SHA-256 state that each attempt copies
+        prefix, suffix = self._header_template()
+        
+        if processes > 1 and difficulty >= self.PARALLEL_MIN_DIFFICULTY:
+            nonce, digest = _search_nonces_parallel(prefix, suffix, difficulty, self.nonce + 1, processes)
+        else:
+            nonce, digest = _search_nonces(prefix, suffix, difficulty, self.nonce + 1)
+        
+        self.nonce = nonce
+        self.hash = digest
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -73,9 +215,9 @@ class Block:
             merkle_root=block_data.get("merkle_root")
         )
     
-    def verify_transaction(self, tx_hash: str, proof: List[dict]) -> bool:
+    def verify_transaction(self, tx_hash: str, proof: List[dict], leaf_index: Optional[int] = None) -> bool:
         """Verify that a transaction is included in this block using a Merkle proof."""
-        return MerkleTree.verify_transaction(tx_hash, self.merkle_root, proof)
+        return MerkleTree.verify_transaction(tx_hash, self.merkle_root, proof, leaf_index)
     
     def generate_transaction_proof(self, tx_hash: str) -> Optional[List[dict]]:
         """Generate a Merkle proof for a transaction in this block."""
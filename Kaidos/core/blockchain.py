@@ -1,26 +1,72 @@
 import hashlib
 import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Union
+from operator import itemgetter
+from typing import Iterator, List, Dict, Any, Optional, Tuple, Union
 from zenithdb import Database, Query
 
 from Kaidos.core.block import Block
 from Kaidos.core.exceptions import InvalidBlockError, ChainValidationError
 
 
+# Leading-zero prefix a hash needs for each difficulty a 64-digit hex hash can meet
+_DIFFICULTY_PREFIXES = tuple('0' * difficulty for difficulty in range(65))
+
+
+def _recompute_hash(block_data: Dict[str, Any]) -> str:
+    # Module level so worker processes can run it; drops database-specific fields
+    fields = {key: value for key, value in block_data.items() if key != '_id'}
+    return Block(**fields).compute_hash()
+
+
 class Blockchain:
     
     # Block reward constants
     INITIAL_REWARD = 50.0
     HALVING_INTERVAL = 210000
     
+    # Fixed proof-of-work difficulty used for validation, and the starting point
+    # for difficulty estimation
+    DEFAULT_DIFFICULTY = 4
+    
+    # Chains longer than this have their block hashes recomputed in worker processes
+    PARALLEL_VALIDATION_MIN_BLOCKS = 2048
+    
+    # Blocks read from the database per step while validating the chain
+    VALIDATION_WINDOW = 4096
+    
     def __init__(self, db_path: str = "kaidos_chain.db"):
         self.db = Database(db_path)
         self.blocks = self.db.collection("blocks")
         self._setup_indexes()
-        self._validate_external_chain_mock = False
         
-        if self.blocks.count() == 0:
+        # While set, blocks are checked for linkage and proof of work only
+        self.validate_external_mode = False
+        
+        # Set when the genesis block is created here, otherwise looked up on first use
+        self._genesis_hash = None
+        self._created_genesis = False
+        
+        # Tip of the chain, looked up on first use and dropped whenever blocks change
+        self._latest_block = None
+        
+        # Opened on first use and kept until close
+        self._tx_manager = None
+        
+        # Hashing workers for long chains, started on first use and kept until close
+        self._hash_pool: Optional[ProcessPoolExecutor] = None
+        self._hash_pool_lock = threading.Lock()
+        
+        # Blocks only change through this class, so the length is counted once and
+        # kept up to date; difficulty is cached for the length it was computed at
+        self._chain_length = self.blocks.count()
+        self._difficulty: Optional[Tuple[int, int]] = None
+        
+        if self._chain_length == 0:
             self._create_genesis_block()
     
     def _setup_indexes(self) -> None:
@@ -38,24 +84,68 @@ class Blockchain:
         )
         genesis.hash = genesis.compute_hash()
         self.blocks.insert(genesis.__dict__)
+        self._chain_length = 1
+        
+        self._genesis_hash = genesis.hash
+        self._created_genesis = True
+    
+    @property
+    def genesis_hash(self) -> Optional[str]:
+        if self._genesis_hash is None:
+            genesis = self.get_block_by_index(0)
+            if genesis:
+                self._genesis_hash = genesis["hash"]
+        return self._genesis_hash
+    
+    def initialize(self) -> Tuple[bool, Optional[str]]:
+        # A chain holding only the genesis block created above is valid as is
+        if self._created_genesis:
+            return True, self._genesis_hash
+            
+        return self.is_chain_valid(), self.genesis_hash
     
     def get_latest_block(self) -> Dict[str, Any]:
-        blocks = list(self.blocks.find())
-        if not blocks:
-            return None
-        blocks.sort(key=lambda block: block["index"], reverse=True)
-        return blocks[0]
+        if self._latest_block is None:
+            # Blocks are stored with contiguous indexes from 0, so the tip is a
+            # single indexed lookup rather than a scan of the whole chain
+            length = self._chain_length
+            if not length:
+                return None
+            self._latest_block = self.get_block_by_index(length - 1)
+        return self._latest_block
     
     def add_block(self, block: Block) -> str:
         if not self._is_block_valid(block):
             raise InvalidBlockError("Invalid block: failed validation checks")
         
-        from Kaidos.core.transaction_manager import TransactionManager
-        tx_manager = TransactionManager(self.db.db_path)
-        tx_manager.process_block_transactions(block.__dict__)
-        tx_manager.close()
+        self._get_tx_manager().process_block_transactions(block.__dict__)
         
-        return self.blocks.insert(block.__dict__)
+        self._latest_block = None
+        block_id = self.blocks.insert(block.__dict__)
+        self._chain_length += 1
+        return block_id
+    
+    def add_blocks(self, blocks: List[Block]) -> List[str]:
+        if not blocks:
+            return []
+            
+        # Each block is validated against the one before it, which is not stored yet,
+        # so the tip is tracked in memory until all blocks are written
+        tx_manager = self._get_tx_manager()
+        try:
+            with tx_manager.utxo_write_back():
+                for block in blocks:
+                    if not self._is_block_valid(block):
+                        raise InvalidBlockError(f"Invalid block {block.index}: failed validation checks")
+                    tx_manager.process_block_transactions(block.__dict__)
+                    self._latest_block = block.__dict__
+        finally:
+            self._latest_block = None
+        
+        # Store all blocks in one batch once their transactions are applied
+        block_ids = self.blocks.insert_many([block.__dict__ for block in blocks])
+        self._chain_length += len(blocks)
+        return block_ids
     
     def _is_block_valid(self, block: Block) -> bool:
         latest_block = self.get_latest_block()
@@ -71,23 +161,12 @@ class Blockchain:
             return False
         
         # Check difficulty requirement
-        if not self._is_valid_proof(block, 4):  # Use default difficulty of 4
+        if not self._is_valid_proof(block, self.DEFAULT_DIFFICULTY):
             return False
         
         # Skip transaction validation if we're validating external chains
-        # This is needed for test_resolve_conflicts_common_ancestor
-        try:
-            import inspect
-            stack = inspect.stack()
-            # Check if we're being called from _add_blocks_to_chain in test_consensus.py
-            for frame in stack:
-                if frame.function == '_add_blocks_to_chain' and 'test_consensus.py' in frame.filename:
-                    # We're in the test, check if _validate_external_chain is mocked
-                    import unittest.mock
-                    if unittest.mock._is_started():
-                        return True
-        except:
-            pass
+        if self.validate_external_mode:
+            return True
         
         # Regular transaction validation
         if not self._validate_block_transactions(block):
@@ -95,6 +174,15 @@ class Blockchain:
         
         return True
     
+    @contextmanager
+    def external_validation_mode(self) -> Iterator[None]:
+        previous = self.validate_external_mode
+        self.validate_external_mode = True
+        try:
+            yield
+        finally:
+            self.validate_external_mode = previous
+    
     def _validate_block_transactions(self, block: Block) -> bool:
         if block.index == 0:
             return True
@@ -109,8 +197,7 @@ class Blockchain:
         reward = self.calculate_block_reward(block.index)
         
         fees = 0
-        from Kaidos.core.transaction_manager import TransactionManager
-        tx_manager = TransactionManager(self.db.db_path)
+        tx_manager = self._get_tx_manager()
         
         # Skip transaction validation for blocks with only a coinbase transaction
         if len(block.transactions) > 1:
@@ -120,13 +207,10 @@ class Blockchain:
                     
                     # Validate each transaction in the block
                     if not tx_manager.validate_transaction(tx):
-                        tx_manager.close()
                         return False
                 except Exception:
                     # Ignore validation errors for now
                     pass
-                
-        tx_manager.close()
         
         if len(coinbase_tx["outputs"]) != 1:
             return False
@@ -142,31 +226,41 @@ class Blockchain:
         return True
     
     def _is_valid_proof(self, block: Block, difficulty: int) -> bool:
+        if 0 <= difficulty < len(_DIFFICULTY_PREFIXES):
+            return block.hash.startswith(_DIFFICULTY_PREFIXES[difficulty])
         return block.hash.startswith('0' * difficulty)
     
     def get_difficulty(self) -> int:
+        length = self.get_chain_length()
+        if self._difficulty is not None and self._difficulty[0] == length:
+            return self._difficulty[1]
+            
+        difficulty = self._compute_difficulty(length)
+        self._difficulty = (length, difficulty)
+        return difficulty
+    
+    def _compute_difficulty(self, length: int) -> int:
         # Get the last 10 blocks
-        blocks = self.get_blocks_range(max(0, self.get_chain_length() - 10), self.get_chain_length() - 1)
+        blocks = self.get_blocks_range(max(0, length - 10), length - 1)
         
         if len(blocks) < 2:
-            return 4  # Default difficulty for early blocks
+            return self.DEFAULT_DIFFICULTY  # Default difficulty for early blocks
         
-        # Calculate average time between blocks
+        # Calculate average time between blocks; the gaps between sorted timestamps
+        # sum to the span from the earliest to the latest
         timestamps = [datetime.fromisoformat(block["timestamp"]) for block in blocks]
-        timestamps.sort()
-        
-        time_diffs = [(timestamps[i] - timestamps[i-1]).total_seconds() for i in range(1, len(timestamps))]
-        avg_time = sum(time_diffs) / len(time_diffs)
+        avg_time = (max(timestamps) - min(timestamps)).total_seconds() / (len(timestamps) - 1)
         
         # Target block time: 10 minutes (600 seconds)
         target_time = 600
         
         # Current difficulty
-        current_difficulty = 4
+        current_difficulty = self.DEFAULT_DIFFICULTY
         for block in blocks:
-            if block["hash"].startswith('0' * (current_difficulty + 1)):
+            zeros = self._get_block_difficulty(block)
+            if zeros > current_difficulty:
                 current_difficulty += 1
-            elif not block["hash"].startswith('0' * current_difficulty):
+            elif zeros < current_difficulty:
                 current_difficulty -= 1
         
         # Adjust difficulty based on block time
@@ -183,40 +277,68 @@ class Blockchain:
     
     def is_chain_valid(self) -> bool:
         try:
-            q = Query()
-            chain = list(self.blocks.find())
-            chain.sort(key=lambda block: block["index"])
-            
-            if len(chain) == 0:
+            length = self.get_chain_length()
+            if length == 0:
                 return False
                 
-            for i in range(1, len(chain)):
-                current = chain[i]
-                previous = chain[i-1]
-                
-                if current["index"] != previous["index"] + 1:
-                    return False
-                
-                if current["previous_hash"] != previous["hash"]:
+            # Use a fixed difficulty for validation to avoid issues with adaptive difficulty
+            proof_prefix = _DIFFICULTY_PREFIXES[self.DEFAULT_DIFFICULTY]
+            
+            # Long chains are hashed in the shared pool of workers
+            pool = self._get_hash_pool() if length > self.PARALLEL_VALIDATION_MIN_BLOCKS else None
+            previous = None
+            
+            # Read the chain in index order a window at a time instead of loading it whole
+            for start in range(0, length, self.VALIDATION_WINDOW):
+                window = self.get_blocks_range(start, min(start + self.VALIDATION_WINDOW, length) - 1)
+                if not window:
                     return False
+                if previous is None:
+                    previous, window = window[0], window[1:]
                 
-                # Remove database-specific fields before creating Block
-                block_data = current.copy()
-                if '_id' in block_data:
-                    block_data.pop('_id')
-                temp_block = Block(**block_data)
-                if temp_block.hash != current["hash"]:
-                    return False
+                # Block hashes are independent of each other, so a window's hashes are
+                # recomputed first; linkage between neighbours is then checked in order
+                hashes = self._recompute_hashes(window, pool)
                 
-                # Use a fixed difficulty for validation to avoid issues with adaptive difficulty
-                if not temp_block.hash.startswith('0' * 4):  # Use default difficulty of 4
-                    return False
+                for current, recomputed in zip(window, hashes):
+                    if current["index"] != previous["index"] + 1:
+                        return False
+                    
+                    if current["previous_hash"] != previous["hash"]:
+                        return False
+                    
+                    if recomputed != current["hash"]:
+                        return False
+                    
+                    if not current["hash"].startswith(proof_prefix):
+                        return False
+                        
+                    previous = current
             
             return True
             
         except Exception as e:
             raise ChainValidationError(f"Chain validation failed: {str(e)}")
     
+    def _get_hash_pool(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork: validation runs inside the threaded node, and a
+        # forked worker can inherit locks that other threads held at the time
+        with self._hash_pool_lock:
+            if self._hash_pool is None:
+                self._hash_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+            return self._hash_pool
+    
+    def _recompute_hashes(
+        self,
+        blocks: List[Dict[str, Any]],
+        pool: Optional[ProcessPoolExecutor] = None
+    ) -> List[str]:
+        if pool is None:
+            return [_recompute_hash(block) for block in blocks]
+            
+        # Large chunks keep each worker busy long enough to outweigh pickling
+        return list(pool.map(_recompute_hash, blocks, chunksize=256))
+    
     def get_block_by_hash(self, block_hash: str) -> Optional[Dict[str, Any]]:
         return self.blocks.find_one({"hash": block_hash})
     
@@ -228,15 +350,25 @@ class Blockchain:
         blocks = list(self.blocks.find(
             (q.index >= start_idx) & (q.index <= end_idx)
         ))
-        blocks.sort(key=lambda block: block["index"])
+        # Rows usually come back in insertion order already, which Timsort handles in
+        # a single pass; the C-level key getter avoids a Python call per block
+        blocks.sort(key=itemgetter("index"))
         return blocks
     
+    def iter_blocks(self, start_idx: int, end_idx: int, window: int = 100) -> Iterator[Dict[str, Any]]:
+        # Read the range in fixed-size windows so only one window is held at a time
+        for window_start in range(start_idx, end_idx + 1, window):
+            yield from self.get_blocks_range(window_start, min(window_start + window - 1, end_idx))
+    
     def get_chain_length(self) -> int:
-        return self.blocks.count()
+        return self._chain_length
     
     def resolve_conflicts(self, chains: List[List[Dict[str, Any]]]) -> bool:
-        current_chain = list(self.blocks.find())
-        current_chain.sort(key=lambda block: block["index"])
+        # Only a longer chain can replace ours; skip reading our chain otherwise
+        if not any(len(chain) > self.get_chain_length() for chain in chains):
+            return False
+            
+        current_chain = self.get_blocks_range(0, self.get_chain_length() - 1)
         
         current_length = len(current_chain)
         best_chain = None
@@ -252,13 +384,21 @@ class Blockchain:
         if not best_chain:
             return False
             
+        # A chain that runs through our tip, as during initial sync, only adds blocks;
+        # they are validated and applied on top of the tip in one bulk import
+        if best_chain[current_length - 1]["hash"] == current_chain[-1]["hash"]:
+            new_blocks = [
+                Block(**{key: value for key, value in block.items() if key != '_id'})
+                for block in best_chain[current_length:]
+            ]
+            try:
+                self.add_blocks(new_blocks)
+            except InvalidBlockError:
+                return False
+            return True
+            
         # Find the common ancestor block
-        common_height = 0
-        for i in range(min(current_length, best_chain_length)):
-            if current_chain[i]["hash"] == best_chain[i]["hash"]:
-                common_height = i
-            else:
-                break
+        common_height = self._find_common_ancestor(current_chain, best_chain)
         
         # If chains completely diverge, validate more thoroughly
         if common_height == 0 and current_length > 0:
@@ -266,8 +406,9 @@ class Blockchain:
             if not self._validate_chain_work(best_chain, current_chain):
                 return False
         
-        # Get only the divergent part of the new chain
+        # Get only the divergent part of each chain
         new_blocks = best_chain[common_height + 1:]
+        old_blocks = current_chain[common_height + 1:]
         
         # Handle the reorganization
         bulk_ops = self.blocks.bulk_operations()
@@ -279,18 +420,38 @@ class Blockchain:
             # Add the new blocks
             if new_blocks:
                 self.blocks.insert_many(new_blocks)
+        self._latest_block = None
+        self._chain_length = self.blocks.count()
+        self._difficulty = None
         
         # Rebuild UTXO set for the new chain
-        self._rebuild_utxo_set_from_height(common_height)
+        self._rebuild_utxo_set_from_height(common_height, old_blocks)
         
         return True
     
+    @staticmethod
+    def _find_common_ancestor(current_chain: List[Dict[str, Any]], new_chain: List[Dict[str, Any]]) -> int:
+        # Blocks link to their parent's hash, so two chains that agree at a height
+        # agree at every height below it; binary search for the last agreeing height
+        low, high = 0, min(len(current_chain), len(new_chain)) - 1
+        if high < 0 or current_chain[0]["hash"] != new_chain[0]["hash"]:
+            return 0
+            
+        while low < high:
+            middle = (low + high + 1) // 2
+            if current_chain[middle]["hash"] == new_chain[middle]["hash"]:
+                low = middle
+            else:
+                high = middle - 1
+                
+        return low
+    
     def _validate_chain_work(self, new_chain: List[Dict[str, Any]], current_chain: List[Dict[str, Any]]) -> bool:
         # Calculate cumulative work for both chains
         # Work is approximated as 2^(difficulty) for each block
-        
-        new_work = sum(2 ** self._get_block_difficulty(block) for block in new_chain)
-        current_work = sum(2 ** self._get_block_difficulty(block) for block in current_chain)
+        block_difficulty = self._get_block_difficulty
+        new_work = sum(1 << block_difficulty(block) for block in new_chain)
+        current_work = sum(1 << block_difficulty(block) for block in current_chain)
         
         # New chain should have significantly more work to replace a completely different chain
         return new_work > current_work * 1.1  # 10% more work required
@@ -298,77 +459,80 @@ class Blockchain:
     def _get_block_difficulty(self, block: Dict[str, Any]) -> int:
         # Count leading zeros in the hash
         hash_str = block["hash"]
-        difficulty = 0
-        for char in hash_str:
-            if char == '0':
-                difficulty += 1
-            else:
-                break
-        return difficulty
+        return len(hash_str) - len(hash_str.lstrip('0'))
     
-    def _rebuild_utxo_set_from_height(self, height: int) -> None:
-        from Kaidos.core.transaction_manager import TransactionManager
-        tx_manager = TransactionManager(self.db.db_path)
+    def _rebuild_utxo_set_from_height(self, height: int, old_blocks: List[Dict[str, Any]] = ()) -> None:
+        tx_manager = self._get_tx_manager()
         
         blocks = self.get_blocks_range(height + 1, self.get_chain_length() - 1)
         
-        for block in blocks:
-            tx_manager.process_block_transactions(block)
-            
-        tx_manager.close()
+        # Apply every block's UTXO changes in one database transaction
+        with tx_manager.utxo_write_back():
+            # Take the replaced blocks back out, newest first, then apply the new ones
+            if all(tx_manager.undo_block_transactions(block["hash"]) for block in reversed(old_blocks)):
+                for block in blocks:
+                    tx_manager.process_block_transactions(block)
+                return
+        
+        # A replaced block without an undo record means replaying from genesis
+        self._rebuild_utxo_set(self.get_blocks_range(0, self.get_chain_length() - 1))
     
     def _rebuild_utxo_set(self, chain: List[Dict[str, Any]]) -> None:
-        from Kaidos.core.transaction_manager import TransactionManager
-        tx_manager = TransactionManager(self.db.db_path)
-        
-        tx_manager.utxos.delete_many({})
+        tx_manager = self._get_tx_manager()
         
-        for block in chain:
-            tx_manager.process_block_transactions(block)
+        with tx_manager.utxo_write_back():
+            tx_manager.utxos.delete_many({})
+            tx_manager.block_undo.delete_many({})
             
-        tx_manager.close()
+            for block in chain:
+                tx_manager.process_block_transactions(block)
     
     def _validate_external_chain(self, chain: List[Dict[str, Any]]) -> bool:
         try:
-            # Set flag for validation relaxation
-            self._validate_external_chain_mock = True
+            # Use a fixed difficulty for validation to avoid issues with adaptive difficulty
+            proof_prefix = _DIFFICULTY_PREFIXES[self.DEFAULT_DIFFICULTY]
             
             if chain[0]["index"] != 0:
-                self._validate_external_chain_mock = False
                 return False
                 
+            # Linkage and proof of work are cheap, so they are checked in order first
             for i in range(1, len(chain)):
                 current = chain[i]
                 previous = chain[i-1]
                 
                 if current["index"] != previous["index"] + 1:
-                    self._validate_external_chain_mock = False
                     return False
                 
                 if current["previous_hash"] != previous["hash"]:
-                    self._validate_external_chain_mock = False
                     return False
                 
-                # Remove database-specific fields before creating Block
-                block_data = current.copy()
-                if '_id' in block_data:
-                    block_data.pop('_id')
-                temp_block = Block(**block_data)
-                if temp_block.hash != current["hash"]:
-                    self._validate_external_chain_mock = False
+                if not current["hash"].startswith(proof_prefix):
                     return False
-                
-                # Use a fixed difficulty for validation to avoid issues with adaptive difficulty
-                if not temp_block.hash.startswith('0' * 4):  # Use default difficulty of 4
-                    self._validate_external_chain_mock = False
-                    return False
-            
-            self._validate_external_chain_mock = False
-            return True
             
+            # Then every block's hash is recomputed from its header, in worker
+            # processes for long chains
+            blocks = chain[1:]
+            if len(blocks) > self.PARALLEL_VALIDATION_MIN_BLOCKS:
+                hashes = self._recompute_hashes(blocks, self._get_hash_pool())
+            else:
+                hashes = self._recompute_hashes(blocks)
+                
+            return all(recomputed == block["hash"] for recomputed, block in zip(hashes, blocks))
+        
         except Exception:
-            self._validate_external_chain_mock = False
             return False
     
+    def _get_tx_manager(self):
+        if self._tx_manager is None:
+            from Kaidos.core.transaction_manager import TransactionManager
+            self._tx_manager = TransactionManager(self.db.db_path)
+        return self._tx_manager
+    
     def close(self) -> None:
+        if self._hash_pool is not None:
+            self._hash_pool.shutdown()
+            self._hash_pool = None
+        if self._tx_manager is not None:
+            self._tx_manager.close()
+            self._tx_manager = None
         self.db.close()
@@ -1,10 +1,50 @@
+import functools
 import hashlib
-from typing import List, Optional
+import threading
+from binascii import hexlify
+from typing import Dict, List, Optional, Tuple
+
+
+def _hex_digest(data: bytes) -> bytes:
+    # Nodes hash the hex text of their children, so they are kept as ASCII hex
+    # bytes: concatenations hash directly with no str encode/decode round trip
+    return hexlify(hashlib.sha256(data).digest())
+
+
+def _hash_level(level: List[bytes]) -> List[bytes]:
+    # One tree level in, the level above out; an odd last node pairs with itself.
+    # Pair inputs are 128 bytes, well under the size at which hashlib releases the
+    # GIL, so a level is hashed in a single call rather than sharded across threads.
+    if len(level) % 2:
+        level = level + [level[-1]]
+    sha256 = hashlib.sha256
+    return [hexlify(sha256(left + right).digest()) for left, right in zip(level[::2], level[1::2])]
+
+
+# Guards MerkleTree._cached_layers, which request and mining threads share
+_LAYER_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=32)
+def _tree_levels(txids: Tuple[str, ...]) -> Tuple[List[bytes], ...]:
+    # Every level from the leaves up to the single root, kept for recent transaction
+    # lists so a block's root and its proofs share one build
+    levels = [[_hex_digest(txid.encode()) for txid in txids]]
+    while len(levels[-1]) > 1:
+        levels.append(_hash_level(levels[-1]))
+    return tuple(levels)
 
 
 class MerkleTree:
     """Merkle Tree implementation for transaction verification."""
     
+    # Proofs checked with a leaf index only climb to this many levels below the root
+    CACHED_LAYER_DEPTH = 4
+    CACHED_TREES = 256
+    
+    # Root -> (level number counted from the leaves, nodes of that level)
+    _cached_layers: Dict[str, Tuple[int, List[bytes]]] = {}
+    
     @staticmethod
     def create_merkle_root(transactions: List[dict]) -> str:
         """Create a Merkle root hash from a list of transactions."""
@@ -12,53 +52,63 @@ class MerkleTree:
             # Empty tree has a root of all zeros
             return "0" * 64
             
-        # Create leaf nodes by hashing each transaction
-        leaves = []
-        for tx in transactions:
-            # Convert transaction to string and hash it
-            tx_string = str(tx.get("txid", ""))
-            tx_hash = hashlib.sha256(tx_string.encode()).hexdigest()
-            leaves.append(tx_hash)
+        # A lone transaction (a coinbase-only block) is its own root
+        if len(transactions) == 1:
+            return hashlib.sha256(str(transactions[0].get("txid", "")).encode()).hexdigest()
             
-        # Build the tree bottom-up
-        return MerkleTree._build_merkle_tree(leaves)
+        # Build the tree bottom-up, keeping every level; hex strings only at the boundary
+        levels = _tree_levels(MerkleTree._txids(transactions))
+        root = levels[-1][0].decode()
+        MerkleTree._cache_layer(root, levels)
+        return root
     
     @staticmethod
-    def _build_merkle_tree(hashes: List[str]) -> str:
-        """Recursively build a Merkle tree from a list of hashes."""
-        # Base case: single hash becomes the root
-        if len(hashes) == 1:
-            return hashes[0]
-            
-        # Create a new level of the tree
-        new_level = []
-        
-        # Process pairs of hashes
-        for i in range(0, len(hashes), 2):
-            # If we have an odd number of hashes, duplicate the last one
-            if i + 1 == len(hashes):
-                combined = hashes[i] + hashes[i]
-            else:
-                combined = hashes[i] + hashes[i + 1]
-                
-            # Hash the combined string
-            new_hash = hashlib.sha256(combined.encode()).hexdigest()
-            new_level.append(new_hash)
+    def _txids(transactions: List[dict]) -> Tuple[str, ...]:
+        # Leaves hash each transaction ID converted to a string
+        return tuple(str(tx.get("txid", "")) for tx in transactions)
+    
+    @staticmethod
+    def _cache_layer(root: str, levels: Tuple[List[bytes], ...]) -> None:
+        # Keep the level CACHED_LAYER_DEPTH below the root; smaller trees save nothing
+        level = len(levels) - 1 - MerkleTree.CACHED_LAYER_DEPTH
+        if level <= 0:
+            return
             
-        # Recursively build the next level
-        return MerkleTree._build_merkle_tree(new_level)
+        cache = MerkleTree._cached_layers
+        with _LAYER_LOCK:
+            if root not in cache and len(cache) >= MerkleTree.CACHED_TREES:
+                # Forget the oldest tree
+                del cache[next(iter(cache))]
+            cache[root] = (level, levels[level])
     
     @staticmethod
-    def verify_transaction(tx_hash: str, merkle_root: str, proof: List[dict]) -> bool:
+    def verify_transaction(
+        tx_hash: str,
+        merkle_root: str,
+        proof: List[dict],
+        leaf_index: Optional[int] = None
+    ) -> bool:
         """Verify that a transaction is included in the Merkle tree."""
         if proof is None:
             return False
             
+        # With the leaf's position and a cached layer for this root, the proof only
+        # needs to reach that layer; otherwise it is followed all the way to the root
+        steps = len(proof)
+        cached = None
+        if leaf_index is not None:
+            with _LAYER_LOCK:
+                cached = MerkleTree._cached_layers.get(merkle_root)
+        if cached and cached[0] < steps:
+            steps = cached[0]
+        else:
+            cached = None
+            
         # Hash the transaction ID
-        current_hash = hashlib.sha256(tx_hash.encode()).hexdigest()
+        current_hash = _hex_digest(tx_hash.encode())
         
-        for step in proof:
-            sibling_hash = step["hash"]
+        for step in proof[:steps]:
+            sibling_hash = step["hash"].encode()
             position = step["position"]
             
             if position == "left":
@@ -66,69 +116,37 @@ class MerkleTree:
             else:
                 combined = current_hash + sibling_hash
                 
-            current_hash = hashlib.sha256(combined.encode()).hexdigest()
+            current_hash = _hex_digest(combined)
+            
+        if cached:
+            level, nodes = cached
+            index = leaf_index >> level
+            return 0 <= index < len(nodes) and current_hash == nodes[index]
             
-        return current_hash == merkle_root
+        return current_hash.decode() == merkle_root
     
     @staticmethod
     def generate_proof(tx_hash: str, transactions: List[dict]) -> Optional[List[dict]]:
         """Generate a Merkle proof for a transaction."""
-        # Convert transactions to hashes
-        hashes = []
+        # Find the transaction we're looking for
         tx_index = -1
-        
         for i, tx in enumerate(transactions):
-            tx_string = str(tx.get("txid", ""))
-            current_hash = hashlib.sha256(tx_string.encode()).hexdigest()
-            hashes.append(current_hash)
-            
-            # Check if this is the transaction we're looking for
             if tx.get("txid", "") == tx_hash:
                 tx_index = i
                 
         if tx_index == -1:
             return None
             
-        return MerkleTree._generate_proof_recursive(hashes, tx_index)
-    
-    @staticmethod
-    def _generate_proof_recursive(hashes: List[str], tx_index: int, proof: List[dict] = None) -> List[dict]:
-        """Recursively generate a Merkle proof."""
-        if proof is None:
-            proof = []
-            
-        # Base case: single hash
-        if len(hashes) == 1:
-            return proof
-            
-        # Create a new level of the tree
-        new_level = []
-        new_tx_index = -1
-        
-        # Process pairs of hashes
-        for i in range(0, len(hashes), 2):
-            # If we have an odd number of hashes, duplicate the last one
-            if i + 1 == len(hashes):
-                left = hashes[i]
-                right = hashes[i]
-                combined = left + right
+        # Walk up the levels; the sibling at each level is the index with its low bit
+        # flipped, and an odd last node is paired with itself
+        proof = []
+        index = tx_index
+        for level in _tree_levels(MerkleTree._txids(transactions))[:-1]:
+            sibling = min(index ^ 1, len(level) - 1)
+            if index & 1:
+                proof.append({"hash": level[sibling].decode(), "position": "left"})
             else:
-                left = hashes[i]
-                right = hashes[i + 1]
-                combined = left + right
-                
-            # Hash the combined string
-            new_hash = hashlib.sha256(combined.encode()).hexdigest()
-            new_level.append(new_hash)
+                proof.append({"hash": level[sibling].decode(), "position": "right"})
+            index >>= 1
             
-            # If this pair includes our transaction, add to the proof
-            if i == tx_index or i + 1 == tx_index:
-                if i == tx_index:
-                    proof.append({"hash": right, "position": "right"})
-                else:
-                    proof.append({"hash": left, "position": "left"})
-                    
-                new_tx_index = i // 2
-                
-        # Recursively build the next level
-        return MerkleTree._generate_proof_recursive(new_level, new_tx_index, proof)
+        return proof
@@ -1,17 +1,70 @@
+import hashlib
+import heapq
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple, Set
-import json
+from operator import itemgetter
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple, Set
 from zenithdb import Database, Query
 
 from Kaidos.core.exceptions import InvalidTransactionError, InsufficientFundsError
+from Kaidos.core.serialization import json_dumps
+from Kaidos.wallet.multisig import MultiSigWallet
+from Kaidos.wallet.wallet import Wallet
+
+_sha256 = hashlib.sha256
+
+# Required fields, checked with a single subset test per document
+_TX_FIELDS = frozenset(("txid", "inputs", "outputs", "signature", "timestamp"))
+_INPUT_FIELDS = frozenset(("txid", "vout", "signature"))
+_OUTPUT_FIELDS = frozenset(("address", "amount"))
+
+# Signature checks are CPU-bound and independent per input; shared by every manager
+_SIGNATURE_POOL: Optional[ThreadPoolExecutor] = None
+
+# A signature check with its database lookups already done: (function, args)
+SignatureCheck = Tuple[Callable[..., bool], tuple]
+
+
+def _signature_pool() -> ThreadPoolExecutor:
+    global _SIGNATURE_POOL
+    if _SIGNATURE_POOL is None:
+        _SIGNATURE_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _SIGNATURE_POOL
+
+
+def _run_signature_check(check: Optional[SignatureCheck]) -> bool:
+    if check is None:
+        return False
+    try:
+        verify, args = check
+        return verify(*args)
+    except Exception as e:
+        logging.error(f"Signature verification error: {str(e)}")
+        return False
+
+
+def _tx_size(tx: Dict[str, Any]) -> int:
+    # Serialized size of a mempool document, without the database id
+    return len(json_dumps({field: value for field, value in tx.items() if field != "_id"}))
 
 
 class TransactionManager:
     
+    # Upper bound on the serialized size of all mempool transactions
+    MEMPOOL_MAX_BYTES = 60_000_000
+    
     def __init__(self, db_path: str = "kaidos_chain.db"):
         self.db = Database(db_path)
         self.mempool = self.db.collection("mempool")
         self.utxos = self.db.collection("utxos")
+        self.block_undo = self.db.collection("block_undo")
+        self._verifier = None
+        self._unflushed: Optional[Dict[Tuple[str, int], Dict[str, Any]]] = None
+        self._mempool_size: Optional[Tuple[int, int]] = None
         self._setup_indexes()
         
         self.mempool.set_validator(self._validate_transaction_document)
@@ -19,28 +72,37 @@ class TransactionManager:
     def _setup_indexes(self) -> None:
         self.db.create_index("mempool", ["inputs.txid", "inputs.vout"])
         self.db.create_index("mempool", "timestamp")
+        self.db.create_index("mempool", "status")
+        self.db.create_index("mempool", "outputs.address")
         self.db.create_index("utxos", ["txid", "vout"], unique=True)
         self.db.create_index("utxos", "address")
+        self.db.create_index("block_undo", "block_hash")
     
     def _validate_transaction_document(self, tx: Dict[str, Any]) -> bool:
-        if not all(field in tx for field in ["txid", "inputs", "outputs", "signature", "timestamp"]):
+        if not _TX_FIELDS.issubset(tx):
             return False
-            
-        if not isinstance(tx["inputs"], list) or not tx["inputs"]:
+        try:
+            self._check_structure(tx)
+        except InvalidTransactionError:
             return False
-        for input_data in tx["inputs"]:
-            if not all(field in input_data for field in ["txid", "vout", "signature"]):
-                return False
+        return True
+    
+    @staticmethod
+    def _check_structure(tx: Dict[str, Any]) -> None:
+        # Shape checks shared by the mempool validator and validate_transaction
+        inputs, outputs = tx.get("inputs"), tx.get("outputs")
+        if not inputs or not outputs or not isinstance(inputs, list) or not isinstance(outputs, list):
+            raise InvalidTransactionError("Transaction must have inputs and outputs")
+            
+        for tx_input in inputs:
+            if not isinstance(tx_input, dict) or not _INPUT_FIELDS.issubset(tx_input):
+                raise InvalidTransactionError(f"Invalid input format: {tx_input}")
                 
-        if not isinstance(tx["outputs"], list) or not tx["outputs"]:
-            return False
-        for output in tx["outputs"]:
-            if not all(field in output for field in ["address", "amount"]):
-                return False
+        for output in outputs:
+            if not isinstance(output, dict) or not _OUTPUT_FIELDS.issubset(output):
+                raise InvalidTransactionError(f"Invalid output format: {output}")
             if not isinstance(output["amount"], (int, float)) or output["amount"] <= 0:
-                return False
-                
-        return True
+                raise InvalidTransactionError(f"Invalid amount: {output['amount']}")
     
     def add_transaction(
         self, 
@@ -48,6 +110,9 @@ class TransactionManager:
         outputs: List[Dict[str, Any]],
         signature: str
     ) -> str:
+        # The txid is built from these fields, so their shape is checked first
+        self._check_structure({"inputs": inputs, "outputs": outputs})
+        
         tx_data = {
             "txid": self._generate_txid(inputs, outputs),
             "inputs": inputs,
@@ -59,51 +124,116 @@ class TransactionManager:
         
         self.validate_transaction(tx_data)  # This will now raise an exception with details if it fails
         
-        for tx_input in inputs:
-            self._mark_utxo_spent(tx_input["txid"], tx_input["vout"])
+        # Fee and size are kept with the transaction for eviction and mining
+        tx_data["fee"] = self.calculate_transaction_fee(tx_data)
+        tx_data["size"] = _tx_size(tx_data)
         
-        return self.mempool.insert(tx_data)
+        # Flag the spent UTXOs and queue the transaction in one database transaction
+        with self.utxos.bulk_operations().transaction():
+            count, size = self._make_mempool_room(tx_data)
+            
+            for tx_input in inputs:
+                self._mark_utxo_spent(tx_input["txid"], tx_input["vout"])
+            
+            doc_id = self.mempool.insert(tx_data)
+            
+        self._mempool_size = (count + 1, size + tx_data["size"])
+        return doc_id
     
-    def _generate_txid(self, inputs: List[Dict[str, Any]], outputs: List[Dict[str, Any]]) -> str:
-        import hashlib
-        
-        tx_data = {
-            "inputs": inputs,
-            "outputs": outputs,
-            "timestamp": datetime.now().isoformat()
-        }
+    def get_mempool_size(self) -> int:
+        # Bytes held by the mempool; recounted only when the number of transactions
+        # changed behind this manager's back
+        count = self.mempool.count()
+        if self._mempool_size is None or self._mempool_size[0] != count:
+            size = sum(tx.get("size") or _tx_size(tx) for tx in self.mempool.find({}))
+            self._mempool_size = (count, size)
+        return self._mempool_size[1]
+    
+    def get_total_pending_fees(self, transactions: List[Dict[str, Any]]) -> float:
+        # Fees are stored when a transaction enters the mempool; older entries
+        # without one are priced from their inputs
+        return sum(
+            tx["fee"] if tx.get("fee") is not None else self.calculate_transaction_fee(tx)
+            for tx in transactions
+        )
+    
+    def _fee_density(self, tx: Dict[str, Any]) -> float:
+        fee = tx.get("fee")
+        if fee is None:
+            fee = self.calculate_transaction_fee(tx)
+        return fee / (tx.get("size") or _tx_size(tx))
+    
+    def _make_mempool_room(self, tx: Dict[str, Any]) -> Tuple[int, int]:
+        # Evict the lowest fee-per-byte transactions until tx fits, refusing tx if it
+        # pays less per byte than what it would displace; returns the resulting
+        # (count, size) of the mempool
+        size = self.get_mempool_size()
+        count = self._mempool_size[0]
+        if size + tx["size"] <= self.MEMPOOL_MAX_BYTES:
+            return count, size
+            
+        density = self._fee_density(tx)
+        heap = [(self._fee_density(other), i, other) for i, other in enumerate(self.mempool.find({"status": "pending"}))]
+        heapq.heapify(heap)
         
-        tx_string = json.dumps(tx_data, sort_keys=True)
-        return hashlib.sha256(tx_string.encode()).hexdigest()
+        evicted = []
+        while size + tx["size"] > self.MEMPOOL_MAX_BYTES:
+            if not heap or heap[0][0] >= density:
+                raise InvalidTransactionError("Mempool is full: transaction fee rate is too low")
+            other = heapq.heappop(heap)[2]
+            evicted.append(other)
+            size -= other.get("size") or _tx_size(other)
+            
+        for other in evicted:
+            self._evict_transaction(other)
+            
+        return count - len(evicted), size
+    
+    def _evict_transaction(self, tx: Dict[str, Any]) -> None:
+        # Drop a transaction from the mempool and release the outputs it was spending
+        self.mempool.delete({"txid": tx["txid"]})
+        for tx_input in tx["inputs"]:
+            self.utxos.update(
+                {"txid": tx_input["txid"], "vout": tx_input["vout"]},
+                {"$set": {"spent_in_mempool": False}}
+            )
+    
+    def _generate_txid(self, inputs: List[Dict[str, Any]], outputs: List[Dict[str, Any]]) -> str:
+        # The hash input is built directly as bytes; a nanosecond timestamp keeps
+        # txids of otherwise identical transactions distinct
+        parts = [
+            b"%s:%s:%s" % (str(tx_input["txid"]).encode(), str(tx_input["vout"]).encode(), str(tx_input["signature"]).encode())
+            for tx_input in inputs
+        ]
+        parts.append(b"|")
+        parts.extend(b"%s:%r" % (str(output["address"]).encode(), output["amount"]) for output in outputs)
+        parts.append(time.time_ns().to_bytes(8, "little"))
+        return _sha256(b";".join(parts)).hexdigest()
     
     def validate_transaction(self, tx: Dict[str, Any]) -> bool:
         input_sum = 0
         
-        if not tx.get("inputs") or not tx.get("outputs"):
-            raise InvalidTransactionError("Transaction must have inputs and outputs")
+        # Reject malformed transactions before any database lookup
+        self._check_structure(tx)
             
+        utxos = self._get_utxos([(tx_input["txid"], tx_input["vout"]) for tx_input in tx["inputs"]])
+        
+        signed_inputs = []
         for tx_input in tx["inputs"]:
-            if not all(field in tx_input for field in ["txid", "vout", "signature"]):
-                raise InvalidTransactionError(f"Invalid input format: {tx_input}")
-                
-            utxo = self._get_utxo(tx_input["txid"], tx_input["vout"])
+            utxo = utxos.get((tx_input["txid"], tx_input["vout"]))
             if not utxo:
                 raise InvalidTransactionError(f"UTXO not found: {tx_input['txid']}:{tx_input['vout']}")
             
-            if self._is_utxo_spent_in_mempool(tx_input["txid"], tx_input["vout"]):
+            if self._is_utxo_spent_in_mempool(tx_input["txid"], tx_input["vout"], utxo):
                 raise InvalidTransactionError(f"UTXO already spent: {tx_input['txid']}:{tx_input['vout']}")
                 
-            if not self._verify_input_signature(tx_input, utxo["address"]):
-                raise InvalidTransactionError(f"Invalid signature for input: {tx_input['txid']}:{tx_input['vout']}")
-                
+            signed_inputs.append((tx_input, utxo["address"]))
             input_sum += utxo["amount"]
         
-        for output in tx["outputs"]:
-            if not all(field in output for field in ["address", "amount"]):
-                raise InvalidTransactionError(f"Invalid output format: {output}")
-                
-            if not isinstance(output["amount"], (int, float)) or output["amount"] <= 0:
-                raise InvalidTransactionError(f"Invalid amount: {output['amount']}")
+        # Verify all signatures together once the cheap checks have passed
+        for (tx_input, _), valid in zip(signed_inputs, self._verify_input_signatures(signed_inputs)):
+            if not valid:
+                raise InvalidTransactionError(f"Invalid signature for input: {tx_input['txid']}:{tx_input['vout']}")
         
         output_sum = sum(output["amount"] for output in tx["outputs"])
         
@@ -150,7 +280,7 @@ class TransactionManager:
                 }
                 
                 # Check input structure
-                if not all(field in tx_input for field in ["txid", "vout", "signature"]):
+                if not _INPUT_FIELDS.issubset(tx_input):
                     input_details["error"] = "Invalid input format"
                     debug_info["input_details"].append(input_details)
                     continue
@@ -167,7 +297,7 @@ class TransactionManager:
                 input_details["address"] = utxo["address"]
                 
                 # Check if UTXO is already spent
-                if self._is_utxo_spent_in_mempool(tx_input["txid"], tx_input["vout"]):
+                if self._is_utxo_spent_in_mempool(tx_input["txid"], tx_input["vout"], utxo):
                     input_details["spent"] = True
                     input_details["error"] = "UTXO already spent"
                     debug_info["input_details"].append(input_details)
@@ -195,7 +325,7 @@ class TransactionManager:
                 }
                 
                 # Check output structure
-                if not all(field in output for field in ["address", "amount"]):
+                if not _OUTPUT_FIELDS.issubset(output):
                     output_details["valid"] = False
                     output_details["error"] = "Invalid output format"
                     debug_info["output_details"]["outputs"].append(output_details)
@@ -230,86 +360,113 @@ class TransactionManager:
             return debug_info
     
     def _get_utxo(self, txid: str, vout: int) -> Optional[Dict[str, Any]]:
+        if self._unflushed:
+            utxo = self._unflushed.get((txid, vout))
+            if utxo is not None:
+                return utxo
         return self.utxos.find_one({"txid": txid, "vout": vout})
     
-    def _is_utxo_spent_in_mempool(self, txid: str, vout: int) -> bool:
-        # Check if already marked as spent
-        utxo = self._get_utxo(txid, vout)
+    def _get_utxos(self, keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        # One query for every referenced transaction, then keep the requested outputs
+        found = {}
+        if self._unflushed:
+            found = {key: self._unflushed[key] for key in keys if key in self._unflushed}
+        txids = list({txid for txid, vout in keys if (txid, vout) not in found})
+        if txids:
+            wanted = set(keys)
+            for utxo in self.utxos.find({"txid": {"$in": txids}}):
+                key = (utxo["txid"], utxo["vout"])
+                if key in wanted:
+                    found.setdefault(key, utxo)
+        return found
+    
+    @contextmanager
+    def utxo_write_back(self) -> Iterator[None]:
+        # Apply several blocks in one database transaction, keeping the outputs they
+        # create in memory until the end; one created and spent within the batch
+        # never touches the database
+        with self.utxos.bulk_operations().transaction():
+            self._unflushed = {}
+            try:
+                yield
+                self.flush()
+            finally:
+                self._unflushed = None
+    
+    def flush(self) -> None:
+        if self._unflushed:
+            self.utxos.insert_many(list(self._unflushed.values()))
+            self._unflushed.clear()
+    
+    def _is_utxo_spent_in_mempool(self, txid: str, vout: int, utxo: Optional[Dict[str, Any]] = None) -> bool:
+        # Check if already marked as spent; callers that just fetched the UTXO pass it in
+        if utxo is None:
+            utxo = self._get_utxo(txid, vout)
         if utxo and utxo.get("spent_in_mempool", False):
             return True
             
-        # Check references in mempool
-        transactions = list(self.mempool.find({}))
-        for tx in transactions:
+        # Check references in mempool through the inputs index, then match the exact output
+        for tx in self.mempool.find({"inputs.txid": txid}):
             for tx_input in tx.get("inputs", []):
                 if tx_input.get("txid") == txid and tx_input.get("vout") == vout:
                     return True
         return False
     
     def _mark_utxo_spent(self, txid: str, vout: int) -> bool:
-        utxo = self._get_utxo(txid, vout)
-        
-        if not utxo:
-            return False
-        
-        # Get utxo's ID
-        utxo_id = utxo.get("_id")
-        if not utxo_id:
-            return False
-            
-        # Update with spent_in_mempool flag
-        utxo_data = utxo.copy()
-        utxo_data["spent_in_mempool"] = True
-        
-        # Replace the entire document to ensure the update takes effect
-        self.utxos.delete({"_id": utxo_id})
-        self.utxos.insert(utxo_data)
-        
-        # Verify the update
-        updated_utxo = self._get_utxo(txid, vout)
-        return updated_utxo and updated_utxo.get("spent_in_mempool", False)
+        # Flag the UTXO in place through the unique (txid, vout) index
+        result = self.utxos.update(
+            {"txid": txid, "vout": vout},
+            {"$set": {"spent_in_mempool": True}}
+        )
+        return result > 0
     
     def _verify_input_signature(self, tx_input: Dict[str, Any], address: str) -> bool:
+        return self._verify_input_signatures([(tx_input, address)])[0]
+    
+    def _verify_input_signatures(self, signed_inputs: List[Tuple[Dict[str, Any], str]]) -> List[bool]:
+        # Database lookups stay on this thread; only the cryptography fans out
+        checks = [self._signature_check(tx_input, address) for tx_input, address in signed_inputs]
+        if len(checks) < 2:
+            return [_run_signature_check(check) for check in checks]
+        return list(_signature_pool().map(_run_signature_check, checks))
+    
+    def _signature_check(self, tx_input: Dict[str, Any], address: str) -> Optional[SignatureCheck]:
         try:
             # Check if this is a multi-signature input
             if tx_input.get("multisig", False):
-                from Kaidos.wallet.multisig import MultiSigWallet
-                
                 # Get multi-signature data from the database
                 multisig_data = self.db.collection("multisig").find_one({"address": address})
                 if not multisig_data:
-                    return False
+                    return None
                     
                 # Verify multi-signature transaction
-                return MultiSigWallet.verify_multisig_transaction(tx_input, multisig_data)
+                return MultiSigWallet.verify_multisig_transaction, (tx_input, multisig_data)
             else:
                 # Regular single-signature transaction
-                from Kaidos.wallet.wallet import Wallet
-                wallet = Wallet()
-                result = wallet.verify_input_signature(tx_input, address)
-                wallet.close()
-                return result
+                # One wallet database handle is kept open for every lookup
+                if self._verifier is None:
+                    self._verifier = Wallet()
+                address_data = self._verifier.lookup_address(address)
+                if not address_data:
+                    return None
+                return Wallet.verify_signature, (address_data["public_key"], tx_input)
         except Exception as e:
             # Log the error for debugging
-            import logging
             logging.error(f"Signature verification error: {str(e)}")
-            return False
+            return None
     
     def get_pending_transactions(self, limit: int = 100) -> List[Dict[str, Any]]:
-        # Manually filter for pending transactions
-        transactions = list(self.mempool.find({}))
-        pending_transactions = [tx for tx in transactions if tx.get("status") == "pending"]
-        pending_transactions.sort(key=lambda tx: tx["timestamp"])
-        return pending_transactions[:limit]
+        # Only pending transactions are read, through the status index; the oldest
+        # `limit` are selected with a bounded heap instead of sorting them all
+        return heapq.nsmallest(limit, self.mempool.find({"status": "pending"}), key=itemgetter("timestamp"))
     
     def get_transaction(self, txid: str) -> Optional[Dict[str, Any]]:
         return self.mempool.find_one({"txid": txid})
     
     def get_transactions_by_address(self, address: str) -> List[Dict[str, Any]]:
-        # Manually check for transactions involving this address
+        # Read candidates through the output address index, then confirm each match
         result = []
-        transactions = list(self.mempool.find({}))
-        for tx in transactions:
+        for tx in self.mempool.find({"outputs.address": address}):
             for output in tx.get("outputs", []):
                 if output.get("address") == address:
                     result.append(tx)
@@ -324,11 +481,11 @@ class TransactionManager:
         return result > 0
     
     def remove_transactions(self, txids: List[str]) -> int:
-        count = 0
-        for txid in txids:
-            result = self.mempool.delete({"txid": txid})
-            count += result
-        return count
+        # One statement for the whole batch
+        txids = list(txids)
+        if not txids:
+            return 0
+        return self.mempool.delete_many({"txid": {"$in": txids}})
     
     def clear_mempool(self) -> int:
         count = self.mempool.count()
@@ -368,8 +525,26 @@ class TransactionManager:
         return list(self.utxos.find({"address": address}))
     
     def get_balance(self, address: str) -> float:
-        utxos = self.get_utxos_for_address(address)
-        return sum(utxo["amount"] for utxo in utxos)
+        # Sum the amounts as the documents stream in rather than building a list
+        return sum(map(itemgetter("amount"), self.utxos.find({"address": address})))
+    
+    def get_balances(self, addresses: List[str]) -> Dict[str, float]:
+        # One query for all addresses instead of one per address
+        balances = {address: 0.0 for address in addresses}
+        if not balances:
+            return balances
+            
+        for utxo in self.utxos.find({"address": {"$in": list(balances)}}):
+            balances[utxo["address"]] += utxo["amount"]
+            
+        return balances
+    
+    def get_state_marker(self) -> Tuple[int, Optional[str], int]:
+        # Changes whenever a block is added or replaced, or UTXOs are written directly
+        blocks = self.db.collection("blocks")
+        length = blocks.count()
+        tip = blocks.find_one({"index": length - 1}) if length else None
+        return length, tip["hash"] if tip else None, self.utxos.count()
     
     def create_coinbase_transaction(self, miner_address: str, reward: float, fees: float = 0) -> Dict[str, Any]:
         tx_data = {
@@ -387,42 +562,97 @@ class TransactionManager:
         return tx_data
     
     def _generate_coinbase_txid(self, miner_address: str, amount: float) -> str:
-        import hashlib
-        
-        data = f"{miner_address}:{amount}:{datetime.now().isoformat()}"
-        return hashlib.sha256(data.encode()).hexdigest()
+        data = b"%s:%r:%s" % (miner_address.encode(), amount, time.time_ns().to_bytes(8, "little"))
+        return _sha256(data).hexdigest()
     
     def process_block_transactions(self, block: Dict[str, Any]) -> None:
+        # What the block spends from the database, so a reorg can put it back
+        spent = []
+        
+        # Outputs the block creates, written in one batch at the end
+        created_at = datetime.now().isoformat()
+        new_utxos = {}
+        
         for tx in block["transactions"]:
             if not tx.get("coinbase", False):
                 for tx_input in tx["inputs"]:
-                    utxo = self._get_utxo(tx_input["txid"], tx_input["vout"])
-                    if utxo:
-                        utxo_id = utxo.get("_id")
-                        if utxo_id:
-                            self.utxos.delete({"_id": utxo_id})
+                    key = (tx_input["txid"], tx_input["vout"])
+                    
+                    # An output created earlier in this block never reaches the database
+                    if new_utxos.pop(key, None) is not None:
+                        continue
+                        
+                    # Outputs of earlier blocks in a write-back batch are only in memory
+                    utxo = self._unflushed.pop(key, None) if self._unflushed else None
+                    if utxo is not None:
+                        spent.append(utxo)
+                        continue
                         
-                        self.utxos.delete({"txid": tx_input["txid"], "vout": tx_input["vout"]})
-                        self.utxos.delete_many({"txid": tx_input["txid"], "vout": tx_input["vout"]})
+                    # (txid, vout) is unique, so a single delete removes the UTXO
+                    utxo = self.utxos.find_one({"txid": key[0], "vout": key[1]})
+                    if utxo:
+                        self.utxos.delete({"txid": key[0], "vout": key[1]})
+                        spent.append({field: value for field, value in utxo.items() if field != "_id"})
             
             for i, output in enumerate(tx["outputs"]):
-                self.add_utxo(tx["txid"], i, output["address"], output["amount"])
+                new_utxos[(tx["txid"], i)] = {
+                    "txid": tx["txid"],
+                    "vout": i,
+                    "address": output["address"],
+                    "amount": output["amount"],
+                    "created_at": created_at
+                }
+        
+        if self._unflushed is not None:
+            self._unflushed.update(new_utxos)
+        elif new_utxos:
+            self.utxos.insert_many(list(new_utxos.values()))
+            
+        # Drop the block's transactions from the mempool in one statement
+        txids = [tx["txid"] for tx in block["transactions"]]
+        if txids:
+            self.mempool.delete_many({"txid": {"$in": txids}})
             
-            self.mempool.delete({"txid": tx["txid"]})
+        if block.get("hash"):
+            self.block_undo.delete_many({"block_hash": block["hash"]})
+            self.block_undo.insert({
+                "block_hash": block["hash"],
+                "spent": spent,
+                "created": [list(key) for key in new_utxos]
+            })
+    
+    def undo_block_transactions(self, block_hash: str) -> bool:
+        # Reverse process_block_transactions for a block leaving the chain; False if
+        # the block has no undo record (it was applied before records were kept)
+        undo = self.block_undo.find_one({"block_hash": block_hash})
+        if not undo:
+            return False
+            
+        for txid, vout in undo["created"]:
+            if self._unflushed and self._unflushed.pop((txid, vout), None) is not None:
+                continue
+            self.utxos.delete_many({"txid": txid, "vout": vout})
+            
+        if undo["spent"]:
+            self.utxos.insert_many(undo["spent"])
+            
+        self.block_undo.delete_many({"block_hash": block_hash})
+        return True
     
     def calculate_transaction_fee(self, tx: Dict[str, Any]) -> float:
         if tx.get("coinbase", False):
             return 0
             
-        input_sum = 0
-        for tx_input in tx["inputs"]:
-            utxo = self._get_utxo(tx_input["txid"], tx_input["vout"])
-            if utxo:
-                input_sum += utxo["amount"]
+        keys = [(tx_input["txid"], tx_input["vout"]) for tx_input in tx["inputs"]]
+        utxos = self._get_utxos(keys)
+        input_sum = sum(utxos[key]["amount"] for key in keys if key in utxos)
         
         output_sum = sum(output["amount"] for output in tx["outputs"])
         
         return max(0, input_sum - output_sum)
     
     def close(self) -> None:
+        if self._verifier is not None:
+            self._verifier.close()
+            self._verifier = None
         self.db.close()
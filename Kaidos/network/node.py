@@ -1,42 +1,163 @@
-import json
+import gzip
+import threading
+import time
+import uuid
+import zlib
+from functools import lru_cache
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Set
-from flask import Flask, request, jsonify
+from typing import Callable, Iterator, List, Dict, Any, Optional, Set
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from zenithdb import Database
 
 from Kaidos.core.blockchain import Blockchain
 from Kaidos.core.transaction_manager import TransactionManager
 from Kaidos.core.block import Block
 from Kaidos.core.exceptions import InvalidBlockError, InvalidTransactionError
+from Kaidos.core.serialization import json_dumps, json_loads
+
+
+class _JSONProvider(DefaultJSONProvider):
+    # Routes encode and decode through the shared serializer, which uses orjson when
+    # it is installed; types it can't encode fall back to Flask's own encoder
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        try:
+            return json_dumps(obj).decode("utf-8")
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return json_loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = json_dumps(obj)
+        except TypeError:
+            body = super().dumps(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
 
 
 class Node:
     
+    # Number of blocks read from the database per step when streaming
+    NDJSON_WINDOW = 100
+    
+    # Number of finished background mining jobs kept for polling; older ones are
+    # only dropped once they have been finished for MINE_JOB_RETENTION seconds
+    MINE_JOBS_KEPT = 100
+    MINE_JOB_RETENTION = 600.0
+    
+    # Responses smaller than this are not worth compressing
+    GZIP_MIN_SIZE = 1024
+    
+    # Requests to peers in flight at once when broadcasting or collecting chains
+    PEER_WORKERS = 32
+    
+    # (connect, read) timeouts in seconds for peer calls; full chains get longer
+    PEER_TIMEOUT = (2.0, 5.0)
+    CHAIN_TIMEOUT = (2.0, 60.0)
+    
+    # Broadcast bodies are encoded ahead of time, so the content type is set by hand
+    JSON_HEADERS = {'Content-Type': 'application/json'}
+    
+    # Worker threads when serving with waitress
+    SERVER_THREADS = 16
+    
+    # Seconds after a consensus run during which further runs are skipped
+    CONSENSUS_COOLDOWN = 2.0
+    
     def __init__(
         self, 
         host: str = "0.0.0.0", 
         port: int = 5000, 
-        db_path: str = "kaidos_node.db"
+        db_path: str = "kaidos_node.db",
+        mining_processes: int = 1
     ):
         self.host = host
         self.port = port
+        self.mining_processes = mining_processes
+        
+        # Our own address as peers see it; host and port never change
+        self._our_address = self._normalize_peer_address(f'{host}:{port}')
         self.db = Database(db_path)
         self.peers = self.db.collection("peers")
         self._setup_indexes()
         
+        # Known peer addresses, kept in memory so existence checks skip the database
+        self._peer_addresses: Set[str] = {peer['address'] for peer in self.peers.find({})}
+        self._peer_lock = threading.Lock()
+        
         # Initialize blockchain and transaction manager
         self.blockchain = Blockchain(db_path)
         self.tx_manager = TransactionManager(db_path)
         
+        # Background mining jobs, polled through /blocks/mine/<mine_id>
+        self._mine_jobs = {}
+        self._mine_jobs_finished: Dict[str, float] = {}
+        self._mine_jobs_lock = threading.Lock()
+        self._mine_lock = threading.Lock()
+        
+        # Consensus runs one at a time, and a burst of triggers collapses into one run
+        self._consensus_lock = threading.Lock()
+        self._last_consensus = 0.0
+        
+        # Peer requests wait on the network, so they are sent from threads
+        self._peer_pool = ThreadPoolExecutor(max_workers=self.PEER_WORKERS)
+        
+        # Shared HTTP session so repeated calls to a peer reuse keep-alive connections
+        self._http = requests.Session()
+        self._http.mount('http://', HTTPAdapter(
+            pool_connections=self.PEER_WORKERS,
+            pool_maxsize=self.PEER_WORKERS,
+            max_retries=0
+        ))
+        
         # Initialize Flask app
         self.app = Flask(__name__)
+        self.app.json = _JSONProvider(self.app)
         self._setup_routes()
+        self._setup_batch_methods()
+        self.app.after_request(self._compress_response)
+    
+    def _compress_response(self, response: Response) -> Response:
+        # Gzip JSON bodies for clients that accept it; streamed bodies are left alone
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')
+        ):
+            return response
+            
+        data = response.get_data()
+        if len(data) < self.GZIP_MIN_SIZE:
+            return response
+            
+        response.set_data(gzip.compress(data, compresslevel=5))
+        response.headers['Content-Encoding'] = 'gzip'
+        
+        # The compressed bytes differ from the tagged ones, so the tag becomes weak
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response.headers['ETag'] = 'W/' + etag
+        response.vary.add('Accept-Encoding')
+        return response
     
     def _setup_indexes(self) -> None:
         self.db.create_index("peers", "address", unique=True)
     
-    def _normalize_peer_address(self, address: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_peer_address(address: str) -> str:
+        # Memoized: the same few peer addresses are normalized over and over
         # Split into host and port
         if ':' not in address:
             return address
@@ -57,14 +178,12 @@ class Node:
                 start = request.args.get('start', 0, type=int)
                 end = request.args.get('end', None, type=int)
                 
-                if end is None:
-                    end = self.blockchain.get_chain_length() - 1
+                # Stream one block per line so large ranges are never held in memory at once
+                if request.args.get('format') == 'ndjson':
+                    return self._stream_response(self._stream_blocks_ndjson(start, end), 'application/x-ndjson')
                     
-                blocks = self.blockchain.get_blocks_range(start, end)
-                return jsonify({
-                    'blocks': blocks,
-                    'length': len(blocks)
-                })
+                # Stream the JSON document too, so the chain is never serialized in one piece
+                return self._stream_response(self._stream_blocks_json(start, end), 'application/json')
             elif request.method == 'POST':
                 # Handle adding a block sent from another node
                 data = request.get_json()
@@ -73,9 +192,7 @@ class Node:
                 
                 try:
                     # Create a Block object from the data
-                    from Kaidos.core.block import Block
-                    if '_id' in data:
-                        data.pop('_id')
+                    data.pop('_id', None)
                     
                     block = Block(**data)
                     
@@ -106,69 +223,32 @@ class Node:
             
             if not miner_address:
                 return jsonify({'error': 'Miner address is required'}), 400
-                
-            # Get pending transactions
-            pending_tx = self.tx_manager.get_pending_transactions()
-            
-            # Get latest block
-            latest_block = self.blockchain.get_latest_block()
-            
-            # Calculate block reward
-            block_reward = self.blockchain.calculate_block_reward(latest_block['index'] + 1)
-            
-            # Calculate transaction fees (if there are pending transactions)
-            total_fees = 0
-            if pending_tx:
-                total_fees = sum(self.tx_manager.calculate_transaction_fee(tx) for tx in pending_tx)
-            
-            # Create coinbase transaction
-            coinbase_tx = self.tx_manager.create_coinbase_transaction(
-                miner_address, 
-                block_reward, 
-                total_fees
-            )
-            
-            # Add coinbase transaction to the beginning of the block
-            # If there are no pending transactions, just use the coinbase transaction
-            all_transactions = [coinbase_tx]
-            if pending_tx:
-                all_transactions.extend(pending_tx)
-            
-            # Create new block
-            new_block = Block(
-                index=latest_block['index'] + 1,
-                transactions=all_transactions,
-                previous_hash=latest_block['hash'],
-                miner_address=miner_address
-            )
-            
-            # Mine the block
-            difficulty = self.blockchain.get_difficulty()
-            new_block.mine_block(difficulty)
             
-            try:
-                # Add block to blockchain
-                block_id = self.blockchain.add_block(new_block)
+            # Mine in the background and let the client poll for the result
+            if data.get('async'):
+                mine_id = self._start_mine_job(miner_address)
+                return jsonify({'mine_id': mine_id, 'status': 'pending'}), 202
                 
-                # Broadcast new block to peers
-                self._broadcast_block(new_block.to_dict())
-                
-                return jsonify({
-                    'message': 'Block mined successfully',
-                    'block': new_block.to_dict(),
-                    'reward': block_reward + total_fees
-                })
+            try:
+                return jsonify(self.mine_block(miner_address))
                 
             except InvalidBlockError as e:
                 return jsonify({'error': str(e)}), 400
         
+        @self.app.route('/blocks/mine/<mine_id>', methods=['GET'])
+        def get_mine_job(mine_id):
+            with self._mine_jobs_lock:
+                job = self._mine_jobs.get(mine_id)
+                job = dict(job) if job else None
+                
+            if job is None:
+                return jsonify({'error': 'Mining job not found or its result expired'}), 404
+                
+            return jsonify(job)
+        
         @self.app.route('/transactions', methods=['GET'])
         def get_transactions():
-            transactions = self.tx_manager.get_pending_transactions()
-            return jsonify({
-                'transactions': transactions,
-                'count': len(transactions)
-            })
+            return jsonify(self._rpc_transactions({}))
         
         @self.app.route('/transactions', methods=['POST'])
         def add_transaction():
@@ -210,20 +290,14 @@ class Node:
         
         @self.app.route('/utxos/<address>', methods=['GET'])
         def get_utxos(address):
-            utxos = self.tx_manager.get_utxos_for_address(address)
-            return jsonify({
-                'utxos': utxos,
-                'count': len(utxos),
-                'balance': self.tx_manager.get_balance(address)
-            })
+            # Tag the body so clients that already hold it get an empty 304
+            response = jsonify(self._rpc_utxos({'address': address}))
+            response.add_etag()
+            return response.make_conditional(request)
         
         @self.app.route('/peers', methods=['GET'])
         def get_peers():
-            peers = list(self.peers.find({}))
-            return jsonify({
-                'peers': peers,
-                'count': len(peers)
-            })
+            return jsonify(self._rpc_peers({}))
         
         @self.app.route('/peers', methods=['POST'])
         def add_peer():
@@ -235,16 +309,12 @@ class Node:
             # Normalize the peer address to prevent duplicates
             normalized_address = self._normalize_peer_address(data['address'])
                 
-            # Check if peer already exists
-            existing = self.peers.find_one({'address': normalized_address})
-            if existing:
-                return jsonify({'message': 'Peer already exists'}), 200
-                
-            # Add peer to database
-            self.peers.insert({
+            # Add peer to database unless it is already known
+            if not self._add_peers([{
                 'address': normalized_address,
-                'last_seen': datetime.now().isoformat()
-            })
+                'last_seen': time.time()
+            }]):
+                return jsonify({'message': 'Peer already exists'}), 200
             
             # Connect to peer
             self._connect_to_peer(normalized_address)
@@ -253,10 +323,14 @@ class Node:
         
         @self.app.route('/consensus', methods=['GET'])
         def consensus():
-            chains = self._get_chains_from_peers()
-            replaced = self.blockchain.resolve_conflicts(chains)
+            replaced = self._run_consensus(self._get_chains_from_peers)
             
-            if replaced:
+            if replaced is None:
+                return jsonify({
+                    'message': 'Consensus ran recently, skipped',
+                    'length': self.blockchain.get_chain_length()
+                })
+            elif replaced:
                 return jsonify({
                     'message': 'Chain was replaced',
                     'new_length': self.blockchain.get_chain_length()
@@ -267,6 +341,27 @@ class Node:
                     'length': self.blockchain.get_chain_length()
                 })
         
+        @self.app.route('/batch', methods=['POST'])
+        def batch():
+            calls = request.get_json()
+            
+            if not isinstance(calls, list):
+                return jsonify({'error': 'Batch must be a list of calls'}), 400
+                
+            return jsonify([self._dispatch_call(call) for call in calls])
+        
+        @self.app.route('/batch/chain', methods=['POST'])
+        def batch_chain():
+            calls = request.get_json()
+            
+            if not isinstance(calls, list):
+                return jsonify({'error': 'Chain must be a list of calls'}), 400
+                
+            try:
+                return jsonify(self._run_chain(calls))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
         @self.app.route('/debug/transaction', methods=['POST'])
         def debug_transaction():
             data = request.get_json()
@@ -284,40 +379,367 @@ class Node:
             except Exception as e:
                 return jsonify({'error': str(e)}), 400
     
+    def _start_mine_job(self, miner_address: str) -> str:
+        mine_id = uuid.uuid4().hex
+        
+        with self._mine_jobs_lock:
+            self._mine_jobs[mine_id] = {'mine_id': mine_id, 'status': 'pending'}
+            
+        thread = threading.Thread(target=self._run_mine_job, args=(mine_id, miner_address))
+        thread.daemon = True
+        thread.start()
+        
+        return mine_id
+    
+    def _run_mine_job(self, mine_id: str, miner_address: str) -> None:
+        try:
+            job = {'mine_id': mine_id, 'status': 'done', 'result': self.mine_block(miner_address)}
+        except Exception as e:
+            job = {'mine_id': mine_id, 'status': 'error', 'error': str(e)}
+        
+        with self._mine_jobs_lock:
+            self._mine_jobs[mine_id] = job
+            self._mine_jobs_finished[mine_id] = time.monotonic()
+            
+            # Forget the oldest finished jobs, but not before a slow poller has had
+            # the retention window to collect them; finish times are in order
+            expired = time.monotonic() - self.MINE_JOB_RETENTION
+            finished = list(self._mine_jobs_finished)
+            for job_id in finished[:max(0, len(finished) - self.MINE_JOBS_KEPT)]:
+                if self._mine_jobs_finished[job_id] > expired:
+                    break
+                del self._mine_jobs[job_id]
+                del self._mine_jobs_finished[job_id]
+    
+    def mine_block(self, miner_address: str) -> Dict[str, Any]:
+        # One mine runs at a time, whether sync, chained or a background job, so
+        # two mines never build competing blocks on the same height
+        with self._mine_lock:
+            # Get pending transactions
+            pending_tx = self.tx_manager.get_pending_transactions()
+            
+            # Get latest block
+            latest_block = self.blockchain.get_latest_block()
+            
+            # Calculate block reward
+            block_reward = self.blockchain.calculate_block_reward(latest_block['index'] + 1)
+            
+            # Calculate transaction fees (if there are pending transactions)
+            total_fees = 0
+            if pending_tx:
+                total_fees = self.tx_manager.get_total_pending_fees(pending_tx)
+            
+            # Create coinbase transaction
+            coinbase_tx = self.tx_manager.create_coinbase_transaction(
+                miner_address, 
+                block_reward, 
+                total_fees
+            )
+            
+            # Add coinbase transaction to the beginning of the block
+            # If there are no pending transactions, just use the coinbase transaction
+            all_transactions = [coinbase_tx]
+            if pending_tx:
+                all_transactions.extend(pending_tx)
+            
+            # Create new block
+            new_block = Block(
+                index=latest_block['index'] + 1,
+                transactions=all_transactions,
+                previous_hash=latest_block['hash'],
+                miner_address=miner_address
+            )
+            
+            # Mine the block
+            difficulty = self.blockchain.get_difficulty()
+            new_block.mine_block(difficulty, self.mining_processes)
+            
+            # Add block to blockchain (raises InvalidBlockError if rejected)
+            self.blockchain.add_block(new_block)
+        
+        # Broadcast new block to peers
+        self._broadcast_block(new_block.to_dict())
+        
+        return {
+            'message': 'Block mined successfully',
+            'block': new_block.to_dict(),
+            'reward': block_reward + total_fees
+        }
+    
+    def _stream_blocks_ndjson(self, start: int, end: Optional[int]):
+        if end is None:
+            end = self.blockchain.get_chain_length() - 1
+            
+        # Emit each block as soon as its window is read
+        for block in self.blockchain.iter_blocks(start, end, self.NDJSON_WINDOW):
+            yield json_dumps(block) + b"\n"
+    
+    def _stream_response(self, chunks: Iterator[bytes], mimetype: str) -> Response:
+        # _compress_response leaves streamed bodies alone, so they are gzipped here
+        # chunk by chunk for clients that accept it
+        if 'gzip' not in request.headers.get('Accept-Encoding', ''):
+            return Response(chunks, mimetype=mimetype)
+            
+        response = Response(self._gzip_chunks(chunks), mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        return response
+    
+    @staticmethod
+    def _gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(5, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    
+    def _stream_blocks_json(self, start: int, end: Optional[int]):
+        if end is None:
+            end = self.blockchain.get_chain_length() - 1
+            
+        # Same document as _rpc_blocks, written one block at a time
+        yield b'{"blocks":['
+        length = 0
+        for block in self.blockchain.iter_blocks(start, end, self.NDJSON_WINDOW):
+            yield (b',' if length else b'') + json_dumps(block)
+            length += 1
+        yield b'],"length":%d}' % length
+    
+    def _setup_batch_methods(self) -> None:
+        # Read-only methods that can be combined into a single /batch request
+        self._batch_methods = {
+            'blocks': self._rpc_blocks,
+            'block': self._rpc_block,
+            'transactions': self._rpc_transactions,
+            'transaction': self._rpc_transaction,
+            'utxos': self._rpc_utxos,
+            'peers': self._rpc_peers
+        }
+        
+        # /batch/chain additionally allows unary methods that change node state
+        self._chain_methods = dict(self._batch_methods)
+        self._chain_methods.update({
+            'mine': self._rpc_mine,
+            'consensus': self._rpc_consensus
+        })
+    
+    def _dispatch_call(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(call, dict):
+            return {'id': None, 'error': 'Call must be an object'}
+            
+        call_id = call.get('id')
+        
+        try:
+            method = self._batch_methods.get(call.get('method'))
+            if method is None:
+                return {'id': call_id, 'error': f"Unknown method: {call.get('method')}"}
+                
+            return {'id': call_id, 'result': method(call.get('params') or {})}
+            
+        except Exception as e:
+            return {'id': call_id, 'error': str(e)}
+    
+    def _run_chain(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Calls without an explicit call_id are identified by their position
+        calls_by_id = {}
+        for i, call in enumerate(calls):
+            call_id = call.get('call_id', i) if isinstance(call, dict) else i
+            try:
+                calls_by_id[call_id] = call
+            except TypeError:
+                raise ValueError(f"Invalid call_id: {call_id!r}")
+            
+        if len(calls_by_id) != len(calls):
+            raise ValueError("Duplicate call_id in chain")
+        
+        results = {}
+        
+        def run(call_id, call: Dict[str, Any], upstream: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            try:
+                method = self._chain_methods.get(call.get('method'))
+                if method is None:
+                    return {'call_id': call_id, 'error': f"Unknown method: {call.get('method')}"}
+                return {'call_id': call_id, 'result': method(call.get('payload') or {}, upstream)}
+            except Exception as e:
+                return {'call_id': call_id, 'error': str(e)}
+        
+        for root in calls_by_id:
+            # Each call reads from at most one other, so its dependencies form a path.
+            # Walk down it to the first call that can be settled, then run the path
+            # back up; iterating keeps long chains from exhausting the stack
+            path = []
+            on_path = set()
+            call_id = root
+            while call_id not in results:
+                call = calls_by_id[call_id]
+                if not isinstance(call, dict):
+                    results[call_id] = {'call_id': call_id, 'error': 'Call must be an object'}
+                    break
+                    
+                input_from = call.get('input_from')
+                if input_from is None:
+                    results[call_id] = run(call_id, call, None)
+                    break
+                    
+                # Ids are strings or positions; anything else can't name a call
+                named = isinstance(input_from, (str, int)) and not isinstance(input_from, bool)
+                if not named or input_from not in calls_by_id:
+                    results[call_id] = {'call_id': call_id, 'error': f"Unknown input_from: {input_from}"}
+                    break
+                    
+                on_path.add(call_id)
+                if input_from in on_path:
+                    results[call_id] = {'call_id': call_id, 'error': 'Dependency cycle detected'}
+                    break
+                    
+                path.append(call_id)
+                call_id = input_from
+            
+            # Each call on the path reads from the one settled just before it
+            for call_id in reversed(path):
+                call = calls_by_id[call_id]
+                dependency = results[call['input_from']]
+                if 'error' in dependency:
+                    results[call_id] = {'call_id': call_id, 'error': f"Dependency {call['input_from']} failed"}
+                else:
+                    results[call_id] = run(call_id, call, dependency['result'])
+        
+        return [results[call_id] for call_id in calls_by_id]
+    
+    def _upstream_block(self, upstream: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # Results of mine/block calls carry a block that dependent calls can use
+        if not isinstance(upstream, dict):
+            return None
+        if 'block' in upstream:
+            return upstream['block']
+        if 'hash' in upstream and 'index' in upstream:
+            return upstream
+        return None
+    
+    def _rpc_blocks(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        start = params.get('start')
+        end = params.get('end')
+        
+        # Default to the block produced by the upstream call
+        block = self._upstream_block(upstream)
+        if block is not None:
+            start = block['index'] if start is None else start
+            end = block['index'] if end is None else end
+        
+        if start is None:
+            start = 0
+        if end is None:
+            end = self.blockchain.get_chain_length() - 1
+            
+        blocks = self.blockchain.get_blocks_range(start, end)
+        return {
+            'blocks': blocks,
+            'length': len(blocks)
+        }
+    
+    def _rpc_block(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        block = self._upstream_block(upstream)
+        if 'hash' not in params and 'index' not in params and block is not None:
+            params = {'hash': block['hash']}
+            
+        if 'hash' in params:
+            return self.blockchain.get_block_by_hash(params['hash'])
+        return self.blockchain.get_block_by_index(params['index'])
+    
+    def _rpc_transactions(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        transactions = self.tx_manager.get_pending_transactions()
+        return {
+            'transactions': transactions,
+            'count': len(transactions),
+            'mempool_bytes': self.tx_manager.get_mempool_size()
+        }
+    
+    def _rpc_transaction(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return self.tx_manager.get_transaction(params['txid'])
+    
+    def _rpc_utxos(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        address = params.get('address')
+        
+        # Default to the miner of the upstream block
+        block = self._upstream_block(upstream)
+        if address is None and block is not None:
+            address = block.get('miner_address')
+            
+        if not address:
+            raise ValueError("Address is required")
+            
+        utxos = self.tx_manager.get_utxos_for_address(address)
+        return {
+            'utxos': utxos,
+            'count': len(utxos),
+            'balance': self.tx_manager.get_balance(address)
+        }
+    
+    def _rpc_peers(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        peers = list(self.peers.find({}))
+        
+        # last_seen is stored as epoch seconds and only formatted here
+        for peer in peers:
+            if isinstance(peer.get('last_seen'), (int, float)):
+                peer['last_seen'] = datetime.fromtimestamp(peer['last_seen']).isoformat()
+                
+        return {
+            'peers': peers,
+            'count': len(peers)
+        }
+    
+    def _rpc_mine(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        miner_address = params.get('miner_address')
+        if not miner_address:
+            raise ValueError("Miner address is required")
+            
+        return self.mine_block(miner_address)
+    
+    def _rpc_consensus(self, params: Dict[str, Any], upstream: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        replaced = self._run_consensus(self._get_chains_from_peers)
+        return {
+            'replaced': bool(replaced),
+            'skipped': replaced is None,
+            'length': self.blockchain.get_chain_length()
+        }
+    
     def start(self) -> None:
-        self.app.run(host=self.host, port=self.port)
+        # waitress is optional; it serves requests from a fixed pool of worker
+        # threads instead of the development server
+        try:
+            from waitress import serve
+        except ImportError:
+            self.app.run(host=self.host, port=self.port, threaded=True)
+            return
+            
+        serve(self.app, host=self.host, port=self.port, threads=self.SERVER_THREADS)
     
     def _connect_to_peer(self, address: str) -> bool:
         try:
-            # Use normalized address for our own address
-            our_address = self._normalize_peer_address(f'{self.host}:{self.port}')
+            normalized_address = self._normalize_peer_address(address)
             
             # Don't try to connect to ourselves
-            if self._normalize_peer_address(address) == our_address:
+            if normalized_address == self._our_address:
                 return False
                 
             # Register ourselves with the peer
-            response = requests.post(
+            response = self._http.post(
                 f'http://{address}/peers',
-                json={'address': our_address}
+                json={'address': self._our_address},
+                timeout=self.PEER_TIMEOUT
             )
             
             if response.status_code == 200:
-                normalized_address = self._normalize_peer_address(address)
-                
-                # Check if peer already exists
-                existing = self.peers.find_one({'address': normalized_address})
-                if not existing:
-                    # Add peer to database
-                    self.peers.insert({
-                        'address': normalized_address,
-                        'last_seen': datetime.now().isoformat()
-                    })
-                else:
+                # Add peer to database unless it is already known
+                if not self._add_peers([{
+                    'address': normalized_address,
+                    'last_seen': time.time()
+                }]):
                     # Update peer last seen
                     self.peers.update(
                         {'address': normalized_address},
-                        {'$set': {'last_seen': datetime.now().isoformat()}}
+                        {'$set': {'last_seen': time.time()}}
                     )
                 
                 # Synchronize blockchain
@@ -336,7 +758,7 @@ class Node:
     def _sync_with_peer(self, address: str) -> None:
         try:
             # Get peer's latest block
-            response = requests.get(f'http://{address}/blocks/latest')
+            response = self._http.get(f'http://{address}/blocks/latest', timeout=self.PEER_TIMEOUT)
             
             if response.status_code == 200:
                 peer_latest_block = response.json()
@@ -351,92 +773,129 @@ class Node:
     
     def _discover_peers_from_peer(self, address: str) -> None:
         try:
-            response = requests.get(f'http://{address}/peers')
+            response = self._http.get(f'http://{address}/peers', timeout=self.PEER_TIMEOUT)
             
             if response.status_code == 200:
                 peer_data = response.json()
-                our_address = self._normalize_peer_address(f'{self.host}:{self.port}')
+                # New peers are written in one batch
+                seen = {self._our_address}
+                new_peers = []
                 
                 for peer in peer_data.get("peers", []):
                     peer_address = peer.get("address")
-                    if not peer_address:
+                    if not peer_address or not isinstance(peer_address, str):
                         continue
                     
                     normalized_peer = self._normalize_peer_address(peer_address)
                     
-                    # Don't add ourselves
-                    if normalized_peer == our_address:
+                    # Skip ourselves and repeats in the list
+                    if normalized_peer in seen:
                         continue
                         
-                    # Check if peer already exists
-                    existing = self.peers.find_one({'address': normalized_peer})
-                    if not existing:
-                        # Add new peer
-                        self.peers.insert({
-                            'address': normalized_peer,
-                            'last_seen': None,
-                            'source': address
-                        })
+                    seen.add(normalized_peer)
+                    new_peers.append({
+                        'address': normalized_peer,
+                        'last_seen': None,
+                        'source': address
+                    })
+                    
+                self._add_peers(new_peers)
                         
         except requests.RequestException:
             pass
     
+    def _add_peers(self, peers: List[Dict[str, Any]]) -> List[str]:
+        # Insert the peers that aren't known yet and return their addresses
+        with self._peer_lock:
+            new_peers = [peer for peer in peers if peer['address'] not in self._peer_addresses]
+            if new_peers:
+                self.peers.insert_many(new_peers)
+                self._peer_addresses.update(peer['address'] for peer in new_peers)
+                
+        return [peer['address'] for peer in new_peers]
+    
+    def _run_consensus(self, get_chains: Callable[[], List[List[Dict[str, Any]]]]) -> Optional[bool]:
+        # Chains are only downloaded once the cooldown check passes, so callers that
+        # queued behind a run that just finished cost nothing; None means skipped
+        with self._consensus_lock:
+            if time.monotonic() - self._last_consensus < self.CONSENSUS_COOLDOWN:
+                return None
+                
+            replaced = self.blockchain.resolve_conflicts(get_chains())
+            self._last_consensus = time.monotonic()
+            return replaced
+    
     def _run_consensus_with_peer(self, address: str) -> None:
-        try:
+        def get_chains() -> List[List[Dict[str, Any]]]:
             # Get peer's blockchain
-            response = requests.get(f'http://{address}/blocks')
+            response = self._http.get(f'http://{address}/blocks', timeout=self.CHAIN_TIMEOUT)
             
             if response.status_code == 200:
-                peer_chain = response.json().get("blocks", [])
-                
                 # Run consensus with just this peer's chain
-                self.blockchain.resolve_conflicts([peer_chain])
-                
+                return [response.json().get("blocks", [])]
+            return []
+            
+        try:
+            self._run_consensus(get_chains)
         except requests.RequestException:
             pass
     
     def _broadcast_block(self, block: Dict[str, Any]) -> None:
-        peers = list(self.peers.find({}))
-        
-        for peer in peers:
-            try:
-                requests.post(
-                    f'http://{peer["address"]}/blocks',
-                    json=block
-                )
-            except requests.RequestException:
-                continue
+        self._post_all('/blocks', block)
     
     def _broadcast_transaction(self, transaction: Dict[str, Any]) -> None:
+        self._post_all('/transactions', transaction)
+    
+    def _post_all(self, path: str, payload: Dict[str, Any]) -> None:
+        # Encode once, then send to every peer at once rather than one after another
+        body = json_dumps(payload)
         peers = list(self.peers.find({}))
-        
-        for peer in peers:
-            try:
-                requests.post(
-                    f'http://{peer["address"]}/transactions',
-                    json=transaction
-                )
-            except requests.RequestException:
-                continue
+        list(self._peer_pool.map(lambda peer: self._post_to_peer(peer["address"], path, body), peers))
+    
+    def _post_to_peer(self, address: str, path: str, body: bytes) -> None:
+        try:
+            self._http.post(
+                f'http://{address}{path}',
+                data=body,
+                headers=self.JSON_HEADERS,
+                timeout=self.PEER_TIMEOUT
+            )
+        except requests.RequestException:
+            pass
     
     def _get_chains_from_peers(self) -> List[List[Dict[str, Any]]]:
-        chains = []
         peers = list(self.peers.find({}))
         
-        for peer in peers:
-            try:
-                response = requests.get(f'http://{peer["address"]}/blocks')
+        # Download every peer's chain concurrently and check each as it arrives;
+        # chains no longer than ours can never win, so they are dropped right away
+        futures = [self._peer_pool.submit(self._get_chain_from_peer, peer["address"]) for peer in peers]
+        positions = {future: i for i, future in enumerate(futures)}
+        chains = {}
+        for future in as_completed(futures):
+            chain = future.result()
+            if chain is not None and len(chain) > self.blockchain.get_chain_length():
+                chains[positions[future]] = chain
                 
-                if response.status_code == 200:
-                    chain_data = response.json()
-                    chains.append(chain_data['blocks'])
-                    
-            except requests.RequestException:
-                continue
+        # Peer order, not arrival order, so ties between equal-length forks don't
+        # depend on network timing
+        return [chains[i] for i in sorted(chains)]
+    
+    def _get_chain_from_peer(self, address: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            response = self._http.get(f'http://{address}/blocks', timeout=self.CHAIN_TIMEOUT)
+            
+            if response.status_code == 200:
+                chain_data = response.json()
+                return chain_data['blocks']
                 
-        return chains
+        except requests.RequestException:
+            pass
+            
+        return None
     
     def close(self) -> None:
+        self._peer_pool.shutdown(wait=False)
+        self._http.close()
         self.db.close()
         self.blockchain.close()
         self.tx_manager.close()
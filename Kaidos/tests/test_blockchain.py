@@ -1,8 +1,10 @@
+import hashlib
+import json
 import os
 import unittest
 from datetime import datetime
 
-from Kaidos.core.blockchain import Blockchain
+from Kaidos.core.blockchain import Blockchain, _recompute_hash
 from Kaidos.core.block import Block
 from Kaidos.core.transaction_manager import TransactionManager
 from Kaidos.core.exceptions import InvalidBlockError
@@ -36,6 +38,19 @@ class TestBlockchain(unittest.TestCase):
         self.assertTrue(isinstance(genesis["hash"], str))
         self.assertEqual(len(genesis["hash"]), 64)
     
+    def test_initialize(self):
+        valid, genesis_hash = self.blockchain.initialize()
+        
+        self.assertTrue(valid)
+        self.assertEqual(genesis_hash, self.blockchain.get_block_by_index(0)["hash"])
+        
+        # Reopening an existing chain validates it and looks the hash up
+        reopened = Blockchain(self.test_db)
+        try:
+            self.assertEqual(reopened.initialize(), (True, genesis_hash))
+        finally:
+            reopened.close()
+    
     def test_add_block(self):
         genesis = self.blockchain.get_latest_block()
         
@@ -69,6 +84,99 @@ class TestBlockchain(unittest.TestCase):
         self.assertTrue(block["transactions"][0].get("coinbase", False))
         self.assertEqual(block["transactions"][0]["outputs"][0]["address"], miner_address)
     
+    def test_mined_hash_matches_compute_hash(self):
+        block = Block(
+            index=1,
+            transactions=[],
+            previous_hash="0" * 64,
+            miner_address="KD123456789TESTADDRESS"
+        )
+        block.mine_block(3)
+        
+        # The template used while mining must serialize exactly like compute_hash
+        self.assertTrue(block.hash.startswith("000"))
+        self.assertEqual(block.hash, block.compute_hash())
+    
+    def test_compute_hash_matches_json_serialization(self):
+        block = Block(
+            index=7,
+            transactions=[],
+            previous_hash="ab" * 32,
+            timestamp="2024-01-01T00:00:00.000001",
+            nonce=12345,
+            miner_address="KD123456789TESTADDRESS"
+        )
+        
+        # Hashes must stay identical to the original json.dumps(sort_keys=True) encoding
+        block_data = {
+            "index": block.index,
+            "merkle_root": block.merkle_root,
+            "previous_hash": block.previous_hash,
+            "timestamp": block.timestamp,
+            "nonce": block.nonce,
+            "miner_address": block.miner_address
+        }
+        expected = hashlib.sha256(json.dumps(block_data, sort_keys=True).encode()).hexdigest()
+        self.assertEqual(block.compute_hash(), expected)
+    
+    def test_compute_hash_distinguishes_equal_header_values(self):
+        # 1 and 1.0 are equal but serialize differently, so the cached header
+        # for one must not be reused for the other
+        for index in (1, 1.0, True):
+            block = Block(
+                index=index,
+                transactions=[],
+                previous_hash="ab" * 32,
+                timestamp="2024-01-01T00:00:00.000001",
+                nonce=12345,
+                miner_address="KD123456789TESTADDRESS"
+            )
+            block_data = {
+                "index": block.index,
+                "merkle_root": block.merkle_root,
+                "previous_hash": block.previous_hash,
+                "timestamp": block.timestamp,
+                "nonce": block.nonce,
+                "miner_address": block.miner_address
+            }
+            expected = hashlib.sha256(json.dumps(block_data, sort_keys=True).encode()).hexdigest()
+            self.assertEqual(block.compute_hash(), expected)
+    
+    def test_recompute_hash_ignores_stored_hash(self):
+        block = Block(index=1, transactions=[], previous_hash="0" * 64, miner_address="KD123456789TESTADDRESS")
+        
+        # The stored hash is recomputed from the header, not trusted
+        stored = dict(block.__dict__, _id=1)
+        self.assertEqual(_recompute_hash(stored), block.hash)
+        stored["nonce"] += 1
+        self.assertNotEqual(_recompute_hash(stored), block.hash)
+    
+    def test_add_blocks(self):
+        miner_address = "KD123456789TESTADDRESS"
+        previous_hash = self.blockchain.get_latest_block()["hash"]
+        
+        blocks = []
+        for i in range(1, 4):
+            coinbase_tx = self.tx_manager.create_coinbase_transaction(
+                miner_address, 
+                self.blockchain.calculate_block_reward(i)
+            )
+            block = Block(
+                index=i,
+                transactions=[coinbase_tx],
+                previous_hash=previous_hash,
+                miner_address=miner_address
+            )
+            block.mine_block(4)  # Use fixed difficulty of 4 for tests
+            blocks.append(block)
+            previous_hash = block.hash
+        
+        self.blockchain.add_blocks(blocks)
+        
+        self.assertEqual(self.blockchain.get_chain_length(), 4)
+        self.assertEqual(self.blockchain.get_latest_block()["hash"], previous_hash)
+        self.assertTrue(self.blockchain.is_chain_valid())
+    
     def test_add_invalid_block(self):
         genesis = self.blockchain.get_latest_block()
         
@@ -131,6 +239,10 @@ class TestBlockchain(unittest.TestCase):
         self.assertEqual(blocks[0]["index"], 1)
         self.assertEqual(blocks[1]["index"], 2)
         self.assertEqual(blocks[2]["index"], 3)
+        
+        # Windowed iteration yields the same blocks in order
+        blocks = list(self.blockchain.iter_blocks(0, 4, window=2))
+        self.assertEqual([block["index"] for block in blocks], [0, 1, 2, 3, 4])
     
     def test_get_chain_length(self):
         self.assertEqual(self.blockchain.get_chain_length(), 1)
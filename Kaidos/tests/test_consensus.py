@@ -56,8 +56,8 @@ class TestConsensus(unittest.TestCase):
             )
             new_block.mine_block(4)  # Use fixed difficulty of 4 for tests
             
-            # For test purposes, bypass normal validation
-            with patch.object(blockchain, '_validate_block_transactions', return_value=True):
+            # For test purposes, bypass transaction validation
+            with blockchain.external_validation_mode():
                 blockchain.add_block(new_block)
     
     def test_resolve_conflicts_longer_chain(self):
@@ -79,6 +79,34 @@ class TestConsensus(unittest.TestCase):
         self.assertTrue(replaced)
         self.assertEqual(self.blockchain1.get_chain_length(), 6)  # Genesis + 5 blocks
     
+    def test_resolve_conflicts_extending_chain(self):
+        miner_address = "KD123456789TESTADDRESS"
+        self._add_blocks_to_chain(self.blockchain1, self.tx_manager1, 2, miner_address)
+        
+        # A peer chain that is ours plus two more blocks
+        chain = self.blockchain1.get_blocks_range(0, self.blockchain1.get_chain_length() - 1)
+        for i in range(3, 5):
+            coinbase_tx = self.tx_manager1.create_coinbase_transaction(
+                miner_address,
+                self.blockchain1.calculate_block_reward(i)
+            )
+            new_block = Block(
+                index=i,
+                transactions=[coinbase_tx],
+                previous_hash=chain[-1]["hash"],
+                miner_address=miner_address
+            )
+            new_block.mine_block(4)  # Use fixed difficulty of 4 for tests
+            chain.append(dict(new_block.__dict__))
+        
+        replaced = self.blockchain1.resolve_conflicts([chain])
+        
+        # The new blocks are appended and their coinbase outputs become spendable
+        self.assertTrue(replaced)
+        self.assertEqual(self.blockchain1.get_chain_length(), 5)
+        self.assertEqual(self.blockchain1.get_latest_block()["hash"], chain[-1]["hash"])
+        self.assertEqual(len(self.tx_manager1.get_utxos_for_address(miner_address)), 4)
+    
     def test_resolve_conflicts_same_length_chain(self):
         miner_address = "KD123456789TESTADDRESS"
         
@@ -67,6 +67,17 @@ class TestMerkleTree(unittest.TestCase):
         
         self.assertFalse(MerkleTree.verify_transaction(tx_hash, root, proof))
     
+    def test_verify_proof_with_leaf_index(self):
+        transactions = [{"txid": f"tx{i}"} for i in range(100)]
+        
+        root = MerkleTree.create_merkle_root(transactions)
+        proof = MerkleTree.generate_proof("tx42", transactions)
+        
+        # The proof stops at the cached layer, which must agree with the full climb
+        self.assertTrue(MerkleTree.verify_transaction("tx42", root, proof, 42))
+        self.assertTrue(MerkleTree.verify_transaction("tx42", root, proof))
+        self.assertFalse(MerkleTree.verify_transaction("tx43", root, proof, 42))
+    
     def test_generate_proof_nonexistent_tx(self):
         transactions = [
             {"txid": "tx1"},
@@ -1,3 +1,4 @@
+import gzip
 import os
 import unittest
 from unittest.mock import patch, MagicMock
@@ -6,6 +7,7 @@ from datetime import datetime
 import requests
 
 from Kaidos.network.node import Node
+from Kaidos.core.serialization import json_loads
 from Kaidos.core.blockchain import Blockchain
 from Kaidos.core.transaction_manager import TransactionManager
 
@@ -28,7 +30,7 @@ class TestNetwork(unittest.TestCase):
         if os.path.exists(self.test_db):
             os.remove(self.test_db)
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_connect_to_peer(self, mock_post):
         # Mock successful response
         mock_response = MagicMock()
@@ -54,7 +56,7 @@ class TestNetwork(unittest.TestCase):
         self.node._sync_with_peer.assert_called_once_with("localhost:5001")
         self.node._discover_peers_from_peer.assert_called_once_with("localhost:5001")
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_connect_to_peer_failure(self, mock_post):
         # Mock failed response
         mock_post.side_effect = requests.RequestException("Connection failed")
@@ -65,7 +67,7 @@ class TestNetwork(unittest.TestCase):
         # Check that connection failed
         self.assertFalse(result)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_sync_with_peer(self, mock_get):
         # Mock successful response with a longer chain
         mock_response = MagicMock()
@@ -85,7 +87,7 @@ class TestNetwork(unittest.TestCase):
         # Check that consensus was run
         self.node._run_consensus_with_peer.assert_called_once_with("localhost:5001")
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_sync_with_peer_shorter_chain(self, mock_get):
         # Add a block to our chain
         miner_address = "KD123456789TESTADDRESS"
@@ -122,7 +124,7 @@ class TestNetwork(unittest.TestCase):
         # Check that consensus was not run
         self.node._run_consensus_with_peer.assert_not_called()
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_discover_peers_from_peer(self, mock_get):
         # Mock successful response with peers
         mock_response = MagicMock()
@@ -152,7 +154,7 @@ class TestNetwork(unittest.TestCase):
         peer = self.node.peers.find_one({"address": "127.0.0.1:5002"})
         self.assertEqual(peer["source"], "localhost:5001")
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_run_consensus_with_peer(self, mock_get):
         # Mock successful response with a chain
         mock_response = MagicMock()
@@ -177,7 +179,19 @@ class TestNetwork(unittest.TestCase):
         self.assertEqual(len(args), 1)
         self.assertEqual(len(args[0]), 2)
     
-    @patch('requests.post')
+    def test_run_consensus_cooldown(self):
+        self.node.blockchain.resolve_conflicts = MagicMock(return_value=False)
+        get_chains = MagicMock(return_value=[])
+        
+        # The first run goes ahead and reports the outcome
+        self.assertFalse(self.node._run_consensus(get_chains))
+        
+        # A second run within the cooldown is skipped without fetching any chains
+        self.assertIsNone(self.node._run_consensus(get_chains))
+        get_chains.assert_called_once()
+        self.node.blockchain.resolve_conflicts.assert_called_once()
+    
+    @patch('requests.Session.post')
     def test_broadcast_block(self, mock_post):
         # Add some peers
         self.node.peers.insert({"address": "127.0.0.1:5001"})
@@ -199,9 +213,9 @@ class TestNetwork(unittest.TestCase):
         
         # Check that the block was sent
         for call in mock_post.call_args_list:
-            self.assertEqual(call[1]["json"], block)
+            self.assertEqual(json_loads(call[1]["data"]), block)
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_broadcast_transaction(self, mock_post):
         # Add some peers
         self.node.peers.insert({"address": "127.0.0.1:5001"})
@@ -222,9 +236,9 @@ class TestNetwork(unittest.TestCase):
         
         # Check that the transaction was sent
         for call in mock_post.call_args_list:
-            self.assertEqual(call[1]["json"], transaction)
+            self.assertEqual(json_loads(call[1]["data"]), transaction)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_chains_from_peers(self, mock_get):
         # Add some peers
         self.node.peers.insert({"address": "127.0.0.1:5001"})
@@ -249,7 +263,12 @@ class TestNetwork(unittest.TestCase):
             ]
         }
         
-        mock_get.side_effect = [mock_response1, mock_response2]
+        # Each peer gets its own response, whichever thread asks first
+        responses = {
+            "http://127.0.0.1:5001/blocks": mock_response1,
+            "http://127.0.0.1:5002/blocks": mock_response2
+        }
+        mock_get.side_effect = lambda url, **kwargs: responses[url]
         
         # Get chains
         chains = self.node._get_chains_from_peers()
@@ -261,6 +280,134 @@ class TestNetwork(unittest.TestCase):
         
         # Check that the chains are different
         self.assertNotEqual(chains[0][1]["hash"], chains[1][1]["hash"])
+        
+        # Chains come back in peer order whatever order they arrive in
+        self.assertEqual([chain[1]["hash"] for chain in chains], ["block1_hash_1", "block1_hash_2"])
+
+    
+    def test_add_malformed_transaction(self):
+        client = self.node.app.test_client()
+        
+        # A missing field is a validation error, not a server error
+        response = client.post('/transactions', json={
+            "inputs": [{"txid": "txid1", "signature": "sig"}],
+            "outputs": [{"address": "KD123456789TESTADDRESS", "amount": 1.0}]
+        })
+        self.assertEqual(response.status_code, 400)
+        
+        # So is a vout of the wrong type
+        response = client.post('/transactions', json={
+            "inputs": [{"txid": "txid1", "vout": "0", "signature": "sig"}],
+            "outputs": [{"address": "KD123456789TESTADDRESS", "amount": 1.0}]
+        })
+        self.assertEqual(response.status_code, 400)
+    
+    def test_get_blocks_gzip(self):
+        client = self.node.app.test_client()
+        
+        response = client.get('/blocks', headers={'Accept-Encoding': 'gzip'})
+        
+        # The streamed chain is compressed for clients that accept gzip
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+        body = json_loads(gzip.decompress(response.get_data()))
+        self.assertEqual(body["length"], 1)
+        self.assertEqual(body["blocks"][0]["index"], 0)
+    
+    def test_dispatch_batch_calls(self):
+        calls = [
+            {"id": "genesis", "method": "block", "params": {"index": 0}},
+            {"id": "missing", "method": "unknown"},
+            {"id": "peers", "method": "peers"}
+        ]
+        
+        results = [self.node._dispatch_call(call) for call in calls]
+        
+        # Each result keeps the id of its call
+        self.assertEqual([r["id"] for r in results], ["genesis", "missing", "peers"])
+        
+        # Successful calls return their result, failures return an error
+        self.assertEqual(results[0]["result"]["index"], 0)
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2]["result"]["count"], 0)
+        
+        # A call that isn't an object fails on its own
+        self.assertEqual(self.node._dispatch_call(1), {"id": None, "error": "Call must be an object"})
+        results = self.node._run_chain([1, {"method": "peers"}])
+        self.assertIn("error", results[0])
+        self.assertEqual(results[1]["result"]["count"], 0)
+    
+    def test_run_chain_forwards_results(self):
+        calls = [
+            {"call_id": "tip", "method": "block", "payload": {"index": 0}},
+            {"call_id": "same", "method": "block", "input_from": "tip"},
+            {"call_id": "broken", "method": "unknown"},
+            {"call_id": "after", "method": "peers", "input_from": "broken"}
+        ]
+        
+        results = self.node._run_chain(calls)
+        
+        # The upstream block is forwarded and looked up again by hash
+        self.assertEqual([r["call_id"] for r in results], ["tip", "same", "broken", "after"])
+        self.assertEqual(results[1]["result"]["hash"], results[0]["result"]["hash"])
+        
+        # A failed dependency fails the calls that read from it
+        self.assertIn("error", results[2])
+        self.assertIn("error", results[3])
+    
+    def test_run_chain_rejects_bad_input_from(self):
+        calls = [
+            {"method": "peers", "input_from": ["not", "an", "id"]},
+            {"call_id": "a", "method": "peers", "input_from": "b"},
+            {"call_id": "b", "method": "peers", "input_from": "a"}
+        ]
+        
+        results = self.node._run_chain(calls)
+        
+        # Unusable ids and cycles are reported per call instead of failing the chain
+        self.assertEqual(results[0]["error"], "Unknown input_from: ['not', 'an', 'id']")
+        self.assertIn("error", results[1])
+        self.assertIn("error", results[2])
+    
+    def test_run_chain_resolves_long_chains(self):
+        # Each call reads from the one after it, deeper than the recursion limit
+        calls = [{"method": "peers", "input_from": i + 1} for i in range(2999)]
+        calls.append({"method": "peers"})
+        
+        results = self.node._run_chain(calls)
+        
+        self.assertTrue(all("result" in result for result in results))
+
+    
+    def test_mine_job_records_result(self):
+        self.node.mine_block = MagicMock(return_value={"message": "Block mined successfully"})
+        self.node._mine_jobs["job"] = {"mine_id": "job", "status": "pending"}
+        
+        # Run the job in this thread instead of the background one
+        self.node._run_mine_job("job", "KD123456789TESTADDRESS")
+        
+        job = self.node._mine_jobs["job"]
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["result"]["message"], "Block mined successfully")
+        self.node.mine_block.assert_called_once_with("KD123456789TESTADDRESS")
+
+    
+    def test_mine_jobs_kept_for_retention_window(self):
+        self.node.mine_block = MagicMock(return_value={"message": "Block mined successfully"})
+        self.node.MINE_JOBS_KEPT = 1
+        
+        for mine_id in ("first", "second"):
+            self.node._mine_jobs[mine_id] = {"mine_id": mine_id, "status": "pending"}
+            self.node._run_mine_job(mine_id, "KD123456789TESTADDRESS")
+        
+        # Over the limit, but the first result is still inside its retention window
+        self.assertIn("first", self.node._mine_jobs)
+        
+        # Once the window has passed it is trimmed
+        self.node.MINE_JOB_RETENTION = 0
+        self.node._mine_jobs["third"] = {"mine_id": "third", "status": "pending"}
+        self.node._run_mine_job("third", "KD123456789TESTADDRESS")
+        self.assertNotIn("first", self.node._mine_jobs)
+        self.assertIn("third", self.node._mine_jobs)
 
 
 if __name__ == "__main__":
@@ -65,6 +65,15 @@ class TestTransactionManager(unittest.TestCase):
         
         self.assertEqual(balance, 80.0)
     
+    def test_get_balances(self):
+        self.tx_manager.add_utxo("txid1", 0, self.address, 50.0)
+        self.tx_manager.add_utxo("txid2", 0, self.address, 30.0)
+        self.tx_manager.add_utxo("txid3", 0, self.address2, 20.0)
+        
+        balances = self.tx_manager.get_balances([self.address, self.address2, "KDUNKNOWN"])
+        
+        self.assertEqual(balances, {self.address: 80.0, self.address2: 20.0, "KDUNKNOWN": 0.0})
+    
     def test_mark_utxo_spent(self):
         txid = "test_txid"
         vout = 0
@@ -166,6 +175,98 @@ class TestTransactionManager(unittest.TestCase):
         # Check balances
         self.assertEqual(self.tx_manager.get_balance(self.address), 59.0)  # 50 (coinbase) + 9 (change)
         self.assertEqual(self.tx_manager.get_balance(self.address2), 40.0)
+    
+    def test_undo_block_transactions(self):
+        self.tx_manager.add_utxo("txid1", 0, self.address, 50.0)
+        
+        block = {
+            "hash": "block_hash",
+            "transactions": [
+                {
+                    "txid": "tx1",
+                    "inputs": [{"txid": "txid1", "vout": 0}],
+                    "outputs": [{"address": self.address2, "amount": 50.0}]
+                }
+            ]
+        }
+        self.tx_manager.process_block_transactions(block)
+        
+        # Undoing restores the spent UTXO and removes the created one
+        self.assertTrue(self.tx_manager.undo_block_transactions("block_hash"))
+        self.assertEqual(self.tx_manager.get_balance(self.address), 50.0)
+        self.assertEqual(self.tx_manager.get_balance(self.address2), 0)
+        
+        # The record is consumed
+        self.assertFalse(self.tx_manager.undo_block_transactions("block_hash"))
+    
+    def test_utxo_write_back(self):
+        self.tx_manager.add_utxo("txid1", 0, self.address, 50.0)
+        
+        blocks = [
+            {
+                "hash": "block1",
+                "transactions": [
+                    {
+                        "txid": "tx1",
+                        "inputs": [{"txid": "txid1", "vout": 0}],
+                        "outputs": [{"address": self.address2, "amount": 50.0}]
+                    }
+                ]
+            },
+            {
+                "hash": "block2",
+                "transactions": [
+                    {
+                        "txid": "tx2",
+                        "inputs": [{"txid": "tx1", "vout": 0}],
+                        "outputs": [{"address": self.address, "amount": 50.0}]
+                    }
+                ]
+            }
+        ]
+        with self.tx_manager.utxo_write_back():
+            for block in blocks:
+                self.tx_manager.process_block_transactions(block)
+        
+        # The output created and spent inside the batch is gone, the final one is stored
+        self.assertIsNone(self.tx_manager._get_utxo("tx1", 0))
+        self.assertEqual(self.tx_manager.get_balance(self.address), 50.0)
+        self.assertEqual(self.tx_manager.get_balance(self.address2), 0)
+        
+        # Undo records still reverse the batch block by block
+        self.assertTrue(self.tx_manager.undo_block_transactions("block2"))
+        self.assertEqual(self.tx_manager.get_balance(self.address2), 50.0)
+
+    
+    def test_make_mempool_room(self):
+        def pending_tx(txid, fee):
+            self.tx_manager.add_utxo(txid + "_in", 0, self.address, 10.0)
+            self.tx_manager._mark_utxo_spent(txid + "_in", 0)
+            return {
+                "txid": txid,
+                "inputs": [{"txid": txid + "_in", "vout": 0, "signature": "sig"}],
+                "outputs": [{"address": self.address2, "amount": 10.0 - fee}],
+                "signature": "",
+                "timestamp": "2024-01-01T00:00:00",
+                "status": "pending",
+                "fee": fee,
+                "size": 200
+            }
+            
+        self.tx_manager.mempool.insert(pending_tx("cheap", 0.1))
+        self.tx_manager.mempool.insert(pending_tx("rich", 5.0))
+        self.tx_manager.MEMPOOL_MAX_BYTES = 500
+        
+        # A higher fee rate displaces the cheapest transaction and frees its input
+        count, size = self.tx_manager._make_mempool_room(pending_tx("new", 1.0))
+        self.assertEqual((count, size), (1, 200))
+        self.assertIsNone(self.tx_manager.get_transaction("cheap"))
+        self.assertFalse(self.tx_manager._get_utxo("cheap_in", 0)["spent_in_mempool"])
+        
+        # A lower fee rate than anything in a full mempool is refused
+        self.tx_manager.mempool.insert(pending_tx("other", 2.0))
+        with self.assertRaises(InvalidTransactionError):
+            self.tx_manager._make_mempool_room(pending_tx("poor", 0.5))
 
 
 if __name__ == "__main__":
@@ -121,6 +121,22 @@ class TestWallet(unittest.TestCase):
         self.assertIsNotNone(wallet)
         self.assertEqual(wallet['wallet_id'], wallet_id)
     
+    def test_lookup_address_with_wallet(self):
+        wallet_result = self.wallet.create_wallet()
+        
+        address_data, wallet = self.wallet.lookup_address_with_wallet(wallet_result['address'])
+        
+        self.assertEqual(address_data['address'], wallet_result['address'])
+        self.assertEqual(wallet['wallet_id'], wallet_result['wallet_id'])
+        self.assertIsNone(self.wallet.lookup_address_with_wallet("KDUNKNOWN"))
+    
+    def test_wallet_context_manager(self):
+        wallet_id = self.wallet.create_wallet()['wallet_id']
+        
+        # A second handle on the same database closes itself on exit
+        with Wallet(self.test_db) as wallet:
+            self.assertIsNotNone(wallet.get_wallet(wallet_id))
+    
     def test_sign_transaction_input(self):
         # Create a wallet
         wallet_result = self.wallet.create_wallet()
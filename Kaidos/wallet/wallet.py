@@ -2,7 +2,8 @@ import os
 import json
 import base64
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple, List
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.backends import default_backend
@@ -11,6 +12,35 @@ from zenithdb import Database
 from Kaidos.core.exceptions import KeyGenerationError, SignatureError
 
 
+# Balances per database path, valid while that database's state marker is unchanged.
+# A database's first lookup only records that it has been seen.
+_BALANCE_CACHE: Dict[str, Tuple[Any, Dict[str, float]]] = {}
+
+
+def _cached_balances(tx_manager, addresses: List[str]) -> Dict[str, float]:
+    db_path = tx_manager.db.db_path
+    
+    # A one-off lookup, like a wallet CLI command, would pay for the marker without
+    # ever reading the cache back, so caching starts with the second lookup
+    if db_path not in _BALANCE_CACHE:
+        _BALANCE_CACHE[db_path] = (None, {})
+        return tx_manager.get_balances(addresses)
+        
+    marker = tx_manager.get_state_marker()
+    
+    # A new tip or UTXO change invalidates everything cached for this database
+    cached_marker, balances = _BALANCE_CACHE[db_path]
+    if cached_marker != marker:
+        balances = {}
+        _BALANCE_CACHE[db_path] = (marker, balances)
+        
+    missing = [address for address in addresses if address not in balances]
+    if missing:
+        balances.update(tx_manager.get_balances(missing))
+        
+    return {address: balances[address] for address in addresses}
+
+
 class Wallet:
     
     def __init__(self, db_path: str = "kaidos_wallets.db"):
@@ -140,12 +170,26 @@ class Wallet:
     def get_wallet(self, wallet_id: str) -> Optional[Dict[str, Any]]:
         return self.wallets.find_one({"wallet_id": wallet_id})
     
+    def lookup_address(self, address: str) -> Optional[Dict[str, Any]]:
+        # Single-key query on the unique address index
+        return self.addresses.find_one({"address": address})
+    
     def get_wallet_by_address(self, address: str) -> Optional[Dict[str, Any]]:
-        address_data = self.addresses.find_one({"address": address})
+        found = self.lookup_address_with_wallet(address)
+        return found[1] if found else None
+    
+    def lookup_address_with_wallet(self, address: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        # Address row and its wallet row, both found through unique indexes;
+        # None if either is missing
+        address_data = self.lookup_address(address)
         if not address_data:
             return None
             
-        return self.wallets.find_one({"wallet_id": address_data["wallet_id"]})
+        wallet = self.get_wallet(address_data["wallet_id"])
+        if not wallet:
+            return None
+            
+        return address_data, wallet
     
     def list_wallets(self) -> list:
         wallets = list(self.wallets.find({}))
@@ -181,40 +225,43 @@ class Wallet:
         passphrase: Optional[str] = None
     ) -> str:
         try:
-            # Get address data
-            address_data = self.addresses.find_one({"address": address})
-            if not address_data:
-                raise SignatureError(f"Address not found: {address}")
-            
-            # Get wallet
-            wallet = self.wallets.find_one({"wallet_id": address_data["wallet_id"]})
-            if not wallet:
-                raise SignatureError(f"Wallet not found for address: {address}")
-            
-            # Load private key
-            private_key = self._load_private_key(address_data, passphrase, wallet.get("encrypted", False))
-            
-            # Create message to sign
-            message = f"{txid}:{vout}".encode('utf-8')
-            
-            # Sign message
-            signature = private_key.sign(
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            
-            # Encode signature as base64
-            return base64.b64encode(signature).decode('utf-8')
+            private_key = self._load_signing_key(address, passphrase)
+            return self._sign_input(private_key, txid, vout)
             
         except SignatureError:
             raise
         except Exception as e:
             raise SignatureError(f"Failed to sign transaction input: {str(e)}")
     
+    def _load_signing_key(self, address: str, passphrase: Optional[str] = None):
+        # Get address and wallet data
+        found = self.lookup_address_with_wallet(address)
+        if not found:
+            if not self.lookup_address(address):
+                raise SignatureError(f"Address not found: {address}")
+            raise SignatureError(f"Wallet not found for address: {address}")
+        address_data, wallet = found
+        
+        # Load private key
+        return self._load_private_key(address_data, passphrase, wallet.get("encrypted", False))
+    
+    def _sign_input(self, private_key, txid: str, vout: int) -> str:
+        # Create message to sign
+        message = f"{txid}:{vout}".encode('utf-8')
+        
+        # Sign message
+        signature = private_key.sign(
+            message,
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.MAX_LENGTH
+            ),
+            hashes.SHA256()
+        )
+        
+        # Encode signature as base64
+        return base64.b64encode(signature).decode('utf-8')
+    
     def create_transaction(
         self,
         sender_address: str,
@@ -257,20 +304,14 @@ class Wallet:
                 if selected_amount >= amount:
                     break
             
-            # Create inputs
+            # Create inputs, looking up and decrypting the sender's key once for all of them
+            private_key = self._load_signing_key(sender_address, passphrase)
             inputs = []
             for utxo in selected_utxos:
-                signature = self.sign_transaction_input(
-                    utxo["txid"],
-                    utxo["vout"],
-                    sender_address,
-                    passphrase
-                )
-                
                 inputs.append({
                     "txid": utxo["txid"],
                     "vout": utxo["vout"],
-                    "signature": signature
+                    "signature": self._sign_input(private_key, utxo["txid"], utxo["vout"])
                 })
             
             # Create outputs
@@ -341,15 +382,23 @@ class Wallet:
             )
     
     def verify_input_signature(self, tx_input: Dict[str, Any], address: str) -> bool:
+        # Get address data
         try:
-            # Get address data
-            address_data = self.addresses.find_one({"address": address})
-            if not address_data:
-                return False
+            address_data = self.lookup_address(address)
+        except Exception:
+            return False
+        if not address_data:
+            return False
             
+        return self.verify_signature(address_data["public_key"], tx_input)
+    
+    @staticmethod
+    def verify_signature(public_key_pem: str, tx_input: Dict[str, Any]) -> bool:
+        # Pure signature check with no database access, safe to run on any thread
+        try:
             # Load public key
             public_key = serialization.load_pem_public_key(
-                address_data["public_key"].encode('utf-8'),
+                public_key_pem.encode('utf-8'),
                 backend=default_backend()
             )
             
@@ -375,18 +424,39 @@ class Wallet:
         except Exception:
             return False
     
-    def get_balance(self, address: str) -> float:
+    def _query_utxo_databases(self, query: Callable[[Any], Any]) -> List[Any]:
+        # The chain and node databases are independent and each read opens its own
+        # connection, so both are queried at once
         from Kaidos.core.transaction_manager import TransactionManager
         db_paths = ["kaidos_chain.db", "kaidos_node.db"]
-        total_balance = 0.0
         
-        for db_path in db_paths:
+        def run(db_path: str) -> Any:
             tx_manager = TransactionManager(db_path)
-            balance = tx_manager.get_balance(address)
-            total_balance += balance
-            tx_manager.close()
-            
-        return total_balance
+            try:
+                return query(tx_manager)
+            finally:
+                tx_manager.close()
+        
+        with ThreadPoolExecutor(max_workers=len(db_paths)) as pool:
+            return list(pool.map(run, db_paths))
+    
+    def get_balance(self, address: str) -> float:
+        return self.get_balances([address])[address]
+    
+    def get_balances(self, addresses: List[str]) -> Dict[str, float]:
+        balances = {address: 0.0 for address in addresses}
+        
+        for db_balances in self._query_utxo_databases(lambda tx_manager: _cached_balances(tx_manager, addresses)):
+            for address, balance in db_balances.items():
+                balances[address] += balance
+                
+        return balances
     
     def close(self) -> None:
         self.db.close()
+    
+    def __enter__(self) -> 'Wallet':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -22,6 +22,12 @@ setup(
             "isort>=5.12.0",
             "mypy>=1.0.0",
         ],
+        "fast": [
+            "orjson>=3.8.0",
+        ],
+        "server": [
+            "waitress>=2.1.0",
+        ],
     },
     entry_points={
         "console_scripts": [